@@ -0,0 +1,122 @@
+"""
+JSON encoding benchmark for ProductPagination pages.
+
+Compares, per page size:
+
+- pydantic+json     ORM objects -> ProductPagination -> stdlib json (the old default)
+- pydantic+fast     ORM objects -> ProductPagination -> FastJSONResponse
+- projected+fast    projected dicts -> FastJSONResponse (GET /api/products)
+- projected+stream  projected dicts -> StreamingJSONResponse chunks
+
+No database is needed: rows are synthesized.
+
+    cd server && python -m benchmarks.json_encoding --sizes 10 100 1000
+"""
+import argparse
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from typing import Callable, List
+
+from starlette.responses import JSONResponse
+
+from livezen.enums import ProductStatus, ProductType
+from livezen.product.models import ProductPagination
+from livezen.responses import FastJSONResponse, StreamingJSONResponse, orjson
+
+
+def _type():
+    return {"id": 1, "name": "Grocery", "slug": "grocery", "icon": "FruitsVegetable",
+            "translated_languages": ["en"], "settings": {"isHome": True, "layoutType": "classic"},
+            "banners": [{"title": "Groceries Delivered", "image": {"id": 1, "original": "/img/1.png"}}],
+            "promotional_sliders": [{"id": 1, "original": "/img/slider.png"}]}
+
+
+def _rows(count: int) -> List[dict]:
+    category = {"name": "Fruits", "details": None, "icon": "x", "type_id": 1, "parent_id": None, "id": 1, "slug": "fruits"}
+    tag = {"name": "Fresh", "icon": "x", "type_id": 1, "id": 1, "slug": "fresh"}
+    return [
+        {
+            "name": f"Product {i}", "slug": f"product-{i}", "status": ProductStatus.publish,
+            "product_type": ProductType.simple, "price": 10.5 + i, "sale_price": 9.5 + i, "sku": 1000 + i,
+            "unit": "1kg", "description": "Fresh and organic, picked this morning. " * 4, "type_id": 1,
+            "quantity": 50, "image": {"id": i, "original": f"/img/{i}.png", "thumbnail": f"/img/{i}-t.png"},
+            "id": i, "type": _type(), "categories": [category], "tags": [tag], "related_products": [],
+        }
+        for i in range(count)
+    ]
+
+
+def _objects(rows: List[dict]) -> List[SimpleNamespace]:
+    # Stand-ins for Tortoise instances, read through from_attributes
+    return [
+        SimpleNamespace(**{**row, "type": SimpleNamespace(**row["type"]),
+                           "categories": [SimpleNamespace(**c) for c in row["categories"]],
+                           "tags": [SimpleNamespace(**t) for t in row["tags"]]})
+        for row in rows
+    ]
+
+
+def _pydantic(objects) -> dict:
+    page = ProductPagination(data=objects, itemsPerPage=10, page=1, perPage=len(objects), total=len(objects))
+    return page.model_dump(mode="json")
+
+
+_loop = asyncio.new_event_loop()
+
+
+def _stream(rows) -> bytes:
+    async def collect():
+        response = StreamingJSONResponse(rows, envelope={"itemsPerPage": 10, "page": 1, "total": len(rows)})
+        return b"".join([chunk async for chunk in response.body_iterator])
+    return _loop.run_until_complete(collect())
+
+
+def _measure(fn: Callable[[], object], min_time: float) -> float:
+    """Mean seconds per call, repeating until `min_time` has elapsed."""
+    fn()  # warm up
+    runs, start = 0, time.perf_counter()
+    while True:
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds spent per case")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        rows = _rows(size)
+        objects = _objects(rows)
+        envelope = {"itemsPerPage": 10, "page": 1, "perPage": size, "total": size}
+        cases = {
+            "pydantic+json": lambda: JSONResponse(_pydantic(objects)).body,
+            "pydantic+fast": lambda: FastJSONResponse(_pydantic(objects)).body,
+            "projected+fast": lambda: FastJSONResponse({**envelope, "data": rows}).body,
+            "projected+stream": lambda: _stream(rows),
+        }
+        baseline = None
+        for name, fn in cases.items():
+            seconds = _measure(fn, args.min_time)
+            baseline = baseline or seconds
+            results.append({"size": size, "case": name, "ms": seconds * 1000, "speedup": baseline / seconds})
+
+    if args.json:
+        print(json.dumps({"orjson": orjson is not None, "results": results}, indent=2))
+        return
+    print(f"encoder: {'orjson' if orjson is not None else 'stdlib json'}")
+    print(f"{'size':>6}  {'case':<18}{'ms/page':>10}{'speedup':>9}")
+    for result in results:
+        print(f"{result['size']:>6}  {result['case']:<18}{result['ms']:>10.3f}{result['speedup']:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+API load test: replays a weighted traffic mix at a fixed concurrency and
+reports latency percentiles, throughput and SQL queries per request.
+
+By default the app from livezen.main runs in-process behind httpx's ASGI
+transport (with its lifespan, so caches and indexes are warm) against the
+configured database; seed one first with `python -m livezen.seed`. Pass --url
+to load a running server instead. SQL queries and DB time per request are read
+from the Server-Timing header: the in-process app sends it, a server only with
+SQL_SERVER_TIMING=true.
+
+    cd server && python -m benchmarks.load --concurrency 20 --duration 30 --output run.json
+    python -m benchmarks.load --mix products=6,product=3,toggle=1 --compare run.json
+    python -m benchmarks.load --url http://localhost:8080 --requests 5000
+
+Scenarios (--mix name=weight,...):
+
+    products    GET  /api/products?page=N&page_size=20
+    categories  GET  /api/categories
+    product     GET  /api/products/{slug}
+    toggle      POST /api/wishlists/toggle          (signed in)
+    token       POST /api/auth/token
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import re
+import statistics
+import sys
+import time
+from contextlib import AsyncExitStack
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+DEFAULT_MIX = "products=5,categories=2,product=3,toggle=1,token=1"
+
+# As sent by livezen.querystats.QueryStatsMiddleware
+_SERVER_TIMING = re.compile(r'\bdb;dur=([\d.]+);desc="(\d+) queries"')
+
+
+def db_timing(response: httpx.Response) -> Tuple[Optional[int], Optional[float]]:
+    """(queries, DB milliseconds) from the response's Server-Timing header, if it has one."""
+    match = _SERVER_TIMING.search(response.headers.get("server-timing", ""))
+    if match is None:
+        return None, None
+    return int(match.group(2)), float(match.group(1))
+
+
+class Session:
+    """What the scenarios need: a client, sample data and an auth header."""
+
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random, email: str, password: str):
+        self.client = client
+        self.rng = rng
+        self.email = email
+        self.password = password
+        self.pages = 1
+        self.slugs: List[str] = []
+        self.product_ids: List[int] = []
+        self.headers: Dict[str, str] = {}
+
+    async def setup(self) -> None:
+        response = await self.client.get("/api/products", params={"page_size": 200})
+        response.raise_for_status()
+        body = response.json()
+        self.slugs = [product["slug"] for product in body["data"]]
+        self.product_ids = [product["id"] for product in body["data"]]
+        self.pages = max(1, min((body.get("total") or 0) // 20, 500))
+        if not self.slugs:
+            raise SystemExit("No products found: seed the database first (python -m livezen.seed)")
+
+        response = await self.client.post("/api/auth/token", json={"email": self.email, "password": self.password})
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['token']}"}
+        else:
+            print(f"⚠️  login as {self.email} failed ({response.status_code}): signed-in scenarios will fail")
+
+
+Scenario = Callable[[Session], Awaitable[httpx.Response]]
+
+SCENARIOS: Dict[str, Scenario] = {
+    "products": lambda s: s.client.get(
+        "/api/products", params={"page": s.rng.randint(1, s.pages), "page_size": 20}),
+    "categories": lambda s: s.client.get("/api/categories"),
+    "product": lambda s: s.client.get(f"/api/products/{s.rng.choice(s.slugs)}"),
+    "toggle": lambda s: s.client.post(
+        "/api/wishlists/toggle", json={"product_id": s.rng.choice(s.product_ids)}, headers=s.headers),
+    "token": lambda s: s.client.post("/api/auth/token", json={"email": s.email, "password": s.password}),
+}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    latencies = [sample["ms"] for sample in samples]
+    queries = [sample["queries"] for sample in samples if sample["queries"] is not None]
+    db_ms = [sample["db_ms"] for sample in samples if sample["db_ms"] is not None]
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for sample in samples if sample["status"] >= 400),
+        "rps": len(samples) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": statistics.fmean(latencies) if latencies else None,
+        "queries_per_request": statistics.fmean(queries) if queries else None,
+        "db_ms_per_request": statistics.fmean(db_ms) if db_ms else None,
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    weights = parse_mix(args.mix)
+    names, cum_weights = list(weights), []
+    total = 0.0
+    for name in names:
+        total += weights[name]
+        cum_weights.append(total)
+
+    async with AsyncExitStack() as stack:
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        else:
+            # Before livezen.config is read
+            os.environ["SQL_SERVER_TIMING"] = "true"
+            from livezen.main import app
+            # Run the app's lifespan: Tortoise, catalog snapshot, search and related indexes
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=args.timeout)
+        await stack.enter_async_context(client)
+
+        rng = random.Random(args.seed)
+        session = Session(client, rng, args.email, args.password)
+        await session.setup()
+
+        samples: List[Dict[str, Any]] = []
+        remaining = [args.requests]
+
+        async def worker() -> None:
+            while remaining[0] is None or remaining[0] > 0:
+                if remaining[0] is not None:
+                    remaining[0] -= 1
+                elif time.perf_counter() >= deadline:
+                    return
+                name = rng.choices(names, cum_weights=cum_weights)[0]
+                queries = db_ms = None
+                started = time.perf_counter()
+                try:
+                    response = await SCENARIOS[name](session)
+                    status = response.status_code
+                    queries, db_ms = db_timing(response)
+                except httpx.HTTPError:
+                    status = 599
+                samples.append({
+                    "scenario": name,
+                    "status": status,
+                    "ms": (time.perf_counter() - started) * 1000,
+                    "queries": queries,
+                    "db_ms": db_ms,
+                })
+
+        for _ in range(args.warmup):
+            await SCENARIOS[rng.choices(names, cum_weights=cum_weights)[0]](session)
+
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "config": {
+            "target": args.url or "asgi",
+            "mix": weights,
+            "concurrency": args.concurrency,
+            "duration": args.duration if args.requests is None else None,
+            "requests": args.requests,
+            "seed": args.seed,
+        },
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "elapsed_s": elapsed,
+        "overall": summarize(samples, elapsed),
+        "scenarios": {
+            name: summarize([sample for sample in samples if sample["scenario"] == name], elapsed)
+            for name in names
+        },
+    }
+
+
+COLUMNS = ("requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms", "queries_per_request", "db_ms_per_request")
+HEADERS = ("requests", "errors", "req/s", "p50 ms", "p95 ms", "p99 ms", "queries/req", "db ms/req")
+
+
+def _format(value: Any) -> str:
+    if value is None:
+        return "-"
+    return f"{value:.1f}" if isinstance(value, float) else str(value)
+
+
+def report(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    print(f"{'scenario':<12}" + "".join(f"{header:>16}" for header in HEADERS))
+    rows = {**result["scenarios"], "overall": result["overall"]}
+    for name, stats in rows.items():
+        cells = []
+        for column in COLUMNS:
+            cell = _format(stats[column])
+            before = (baseline or {}).get("scenarios", {}).get(name) if name != "overall" \
+                else (baseline or {}).get("overall")
+            if before and before.get(column) and stats[column] is not None and column not in ("requests", "errors"):
+                cell += f" ({(stats[column] / before[column] - 1) * 100:+.0f}%)"
+            cells.append(f"{cell:>16}")
+        print(f"{name:<12}" + "".join(cells))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Load a running server instead of the in-process app")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Scenario weights, e.g. products=5,toggle=1")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10, help="Seconds to run (ignored with --requests)")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests instead")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests before the run")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--email", default="user0@example.com", help="Seeded user to sign in as")
+    parser.add_argument("--password", default="Passw0rd!")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Show changes against an earlier --output file")
+    args = parser.parse_args(argv)
+
+    # The in-process app logs every application error; keep the report readable
+    logging.getLogger("livezen").setLevel(logging.CRITICAL)
+    result = asyncio.run(run(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    report(result, baseline)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(result, file, indent=2)
+        print(f"results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Micro-benchmarks for code that runs on every request, with a regression gate.
+
+Cases:
+
+- search.compile          `search=` string -> Q (uncached, and the cached hit)
+- serialize.product_page  20 ORM products with type/categories/tags -> ProductRead
+- serialize.category_page 20 ORM categories -> CategoryRead, via CatalogSnapshot
+- auth.jwt_decode         JWT signature check and decode
+- auth.current_user       get_current_user with warm token/user caches
+- auth.permissions        PermissionsDependency([AdminPermission]) on a signed-in request,
+                          including its primary-key read of the admin's role
+- repository.page_query   BaseRepository.paginated's SELECT and COUNT, built but not run
+
+Tortoise runs on an in-memory SQLite database; only auth.permissions queries
+it. Times are also stored relative to a fixed pure-Python calibration loop, so
+a baseline recorded on one machine is usable on another.
+
+    cd server && python -m benchmarks.micro                        # compare with benchmarks/micro_baseline.json
+    python -m benchmarks.micro --save-baseline                     # record a new baseline
+    python -m benchmarks.micro --threshold 1.2 --only serialize    # exit 1 if a case got 20% slower
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Never touch a real database from here
+os.environ["DB_FILE"] = ":memory:"
+
+from starlette.requests import Request  # noqa: E402
+from tortoise import Tortoise  # noqa: E402
+
+from livezen.auth import utils as auth_utils  # noqa: E402
+from livezen.auth.models import JWTPayload, LivezenUser  # noqa: E402
+from livezen.auth.permissions import AdminPermission, PermissionsDependency  # noqa: E402
+from livezen.catalog import CatalogSnapshot  # noqa: E402
+from livezen.category.models import Category  # noqa: E402
+from livezen.config import TORTOISE_ORM, YMA_JWT_ALG, YMA_JWT_SECRET  # noqa: E402
+from livezen.enums import ProductStatus, ProductType, UserRole  # noqa: E402
+from livezen.product.models import Product, ProductRead  # noqa: E402
+from livezen.product.repository import ProductRepository  # noqa: E402
+from livezen.product.views import SEARCH_FIELDS  # noqa: E402
+from livezen.search import _compile  # noqa: E402
+from livezen.tag.models import Tag  # noqa: E402
+from livezen.type.models import Type  # noqa: E402
+
+BASELINE = Path(__file__).with_name("micro_baseline.json")
+SEARCH = "name:apple;type.slug:grocery;status:publish,draft;categories.slug:fruit*;description:fresh"
+PAGE = 20
+
+_loop = asyncio.new_event_loop()
+
+
+def calibrate() -> None:
+    """Fixed interpreter-bound work: dict, list and string operations."""
+    data: Dict[str, int] = {}
+    for i in range(2000):
+        data[f"key{i}"] = i * i
+    sum(value for key, value in data.items() if key.endswith("7"))
+    sorted(data, key=data.get)
+
+
+def _catalog() -> Tuple[Type, List[Category], List[Tag]]:
+    grocery = Type(id=1, name="Grocery", slug="grocery", icon="FruitsVegetable", translated_languages=["en"],
+                   settings={"isHome": True}, banners=[], promotional_sliders=[])
+    grocery._saved_in_db = True  # as if loaded, so products can refer to it
+    # Four roots with four children each
+    categories = [
+        Category(id=i, name=f"Category {i}", slug=f"category-{i}", icon="x", type_id=1,
+                 parent_id=None if i <= 4 else (i - 1) % 4 + 1, translated_languages=["en"], details="Fresh produce")
+        for i in range(1, PAGE + 1)
+    ]
+    tags = [Tag(id=i, name=f"Tag {i}", slug=f"tag-{i}", icon="x", type_id=1) for i in range(1, 4)]
+    return grocery, categories, tags
+
+
+def _products(grocery: Type, categories: List[Category], tags: List[Tag]) -> List[Product]:
+    products = []
+    for i in range(PAGE):
+        product = Product(
+            id=i + 1, name=f"Product {i}", slug=f"product-{i}", status=ProductStatus.publish,
+            product_type=ProductType.simple, price=10.5, sale_price=9.5, sku=1000 + i, unit="1kg",
+            description="Fresh and organic, picked this morning.", quantity=50,
+            image={"id": i, "original": f"/img/{i}.png"}, type=grocery)
+        # As left by prefetch_related
+        for relation, related in (("categories", categories[:2]), ("tags", tags)):
+            manager = getattr(product, relation)
+            manager.related_objects = list(related)
+            manager._fetched = True
+        products.append(product)
+    return products
+
+
+def cases() -> Dict[str, Callable[[], Any]]:
+    grocery, categories, tags = _catalog()
+    products = _products(grocery, categories, tags)
+
+    user = LivezenUser(id=uuid.uuid4(), email="admin@example.com", password="x", role=UserRole.admin)
+    _loop.run_until_complete(user.save())
+    token = auth_utils.create_access_token(data=JWTPayload(
+        user_id=str(user.id), email=user.email, exp=int(time.time()) + 3600))
+    auth_utils._token_cache.clear()
+    auth_utils._user_cache.clear()
+    auth_utils._verify_token(token)
+    auth_utils._user_cache.set(str(user.id), user)
+    headers = [(b"authorization", f"Bearer {token}".encode())]
+
+    def request(state: Optional[dict] = None) -> Request:
+        return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "state": state or {}})
+
+    permissions = PermissionsDependency([AdminPermission])
+    signed_in = {"current_user": user}
+    repository = ProductRepository()
+    q = SEARCH_FIELDS.compile(SEARCH).q
+
+    def page_query() -> None:
+        query = repository._read(q).order_by("-id").offset(40).limit(PAGE)
+        query.sql()
+        repository._read(q).count().sql()
+
+    return {
+        "calibration": calibrate,
+        "search.compile": lambda: _compile.__wrapped__(SEARCH_FIELDS, SEARCH, False, False),
+        "search.compile_cached": lambda: SEARCH_FIELDS.compile(SEARCH),
+        "serialize.product_page": lambda: [ProductRead.model_validate(product) for product in products],
+        # CategoryRead (with parent and child trees) is built when the catalog snapshot is
+        "serialize.category_page": lambda: CatalogSnapshot(0, [grocery], categories, tags),
+        "auth.jwt_decode": lambda: auth_utils.jwt.decode(token, YMA_JWT_SECRET, algorithms=[YMA_JWT_ALG]),
+        "auth.current_user": lambda: _loop.run_until_complete(auth_utils.get_current_user(request())),
+        "auth.permissions": lambda: _loop.run_until_complete(permissions(request(dict(signed_in)))),
+        "repository.page_query": page_query,
+    }
+
+
+def measure(fn: Callable[[], Any], min_time: float, repeat: int = 7) -> float:
+    """Best mean seconds per call over `repeat` rounds of at least `min_time` each."""
+    fn()  # warm up
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_time / 10:
+            break
+        number *= 2
+    best = float("inf")
+    for _ in range(repeat):
+        runs, start = 0, time.perf_counter()
+        while True:
+            for _ in range(number):
+                fn()
+            runs += number
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time / repeat:
+                break
+        best = min(best, elapsed / runs)
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", default=[], help="Run the cases whose names start with these")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds spent per case")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results to --baseline")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="Fail when a case is this many times slower than the baseline")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    _loop.run_until_complete(Tortoise.init(config=TORTOISE_ORM))
+    _loop.run_until_complete(Tortoise.generate_schemas())
+    try:
+        selected = {
+            name: fn for name, fn in cases().items()
+            if name == "calibration" or not args.only or name.startswith(tuple(args.only))
+        }
+        results: Dict[str, Dict[str, float]] = {}
+        for name, fn in selected.items():
+            seconds = measure(fn, args.min_time)
+            results[name] = {"us": seconds * 1e6}
+        # Calibrate again at the end and keep the faster: the machine may have been busy at the start
+        calibration = results["calibration"]["us"] = min(
+            results["calibration"]["us"], measure(calibrate, args.min_time) * 1e6)
+        for result in results.values():
+            result["relative"] = result["us"] / calibration
+    finally:
+        _loop.run_until_complete(Tortoise.close_connections())
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps({"results": results}, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}", file=sys.stderr)
+        baseline = {}
+    else:
+        baseline = json.loads(args.baseline.read_text())["results"] if args.baseline.exists() else {}
+
+    regressions = []
+    rows = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        ratio = result["relative"] / before["relative"] if before and name != "calibration" else None
+        if ratio is not None and ratio > args.threshold:
+            regressions.append(name)
+        rows.append({"case": name, **result, "vs_baseline": ratio})
+
+    if args.json:
+        print(json.dumps({"threshold": args.threshold, "results": rows, "regressions": regressions}, indent=2))
+    else:
+        print(f"{'case':<26}{'us/call':>12}{'vs baseline':>14}")
+        for row in rows:
+            change = "-" if row["vs_baseline"] is None else f"{row['vs_baseline']:.2f}x"
+            flag = "  ❌ regression" if row["case"] in regressions else ""
+            print(f"{row['case']:<26}{row['us']:>12.2f}{change:>14}{flag}")
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than {args.threshold}x the baseline: {', '.join(regressions)}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
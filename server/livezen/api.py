@@ -2,7 +2,6 @@
 
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
-from starlette.responses import JSONResponse
 
 from livezen.auth.utils import get_current_user
 from livezen.auth.views import auth_router
@@ -13,6 +12,7 @@ from livezen.tag.views import router as tag_router
 from livezen.product.views import router as product_router
 from livezen.wishlist.views import router as whishlist_router
 from livezen.settings.views import router as settings_router
+from livezen.responses import FastJSONResponse
 
 
 class ErrorMessage(BaseModel):
@@ -29,7 +29,7 @@ class ErrorResponse(BaseModel):
 
 api_router = APIRouter(
     prefix="/api",
-    default_response_class=JSONResponse,
+    default_response_class=FastJSONResponse,
     responses={
         400: {"model": ErrorResponse},
         401: {"model": ErrorResponse},
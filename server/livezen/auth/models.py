@@ -1,7 +1,6 @@
 from datetime import datetime
 from typing import Any, Optional
 from uuid import UUID
-import bcrypt
 
 from fastapi.exceptions import RequestValidationError
 from pydantic import BaseModel, EmailStr, field_validator
@@ -53,19 +52,6 @@ class Profile(models.Model, TimestampMixin):
         table = "profile"
 
 
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt and return as string."""
-    pw = password.encode("utf-8")
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(pw, salt)
-    return hashed.decode("utf-8")
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against the hashed one."""
-    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
-
-
 class UserLogin(BaseModel):
     email: str
     password: str
@@ -158,12 +144,6 @@ class UserCreate(BaseModel):
     password: str
     role: Optional[str] = None
 
-    @field_validator("password", mode="before")
-    @classmethod
-    def hash(cls, v):
-        """Hash the password before storing."""
-        return hash_password(str(v))
-
 
 class ProfileCreate(BaseModel):
     """Pydantic model for creating a new user profile."""
@@ -5,7 +5,8 @@ from fastapi import HTTPException
 from starlette.requests import Request
 from starlette.status import HTTP_403_FORBIDDEN, HTTP_404_NOT_FOUND
 
-from livezen.auth.utils import get_current_user
+from livezen.auth.models import LivezenUser
+from livezen.auth.utils import get_current_user, invalidate_user
 from livezen.enums import UserRole
 from livezen.exceptions import ResourceNotFoundException
 
@@ -25,6 +26,9 @@ class BasePermission(ABC):
     role_error_code = HTTP_403_FORBIDDEN
 
     role = None
+    # Read the role from the database instead of the cached user, which another
+    # worker's role change or ban reaches only after AUTH_USER_CACHE_TTL
+    fresh_role = False
 
     @abstractmethod
     async def has_required_permissions(self, request: Request) -> bool: ...
@@ -41,6 +45,11 @@ class BasePermission(ABC):
             )
 
         self.role = user.role  # Assuming your User model has a `.role`
+        if self.fresh_role:
+            # None when the user was deactivated or deleted
+            self.role = await LivezenUser.filter(id=user.id, is_active=True).first().values_list("role", flat=True)
+            if self.role != user.role:
+                invalidate_user(user.id)
 
         if not await self.has_required_permissions(request):
             raise HTTPException(
@@ -64,5 +73,7 @@ class PermissionsDependency(object):
 
 
 class AdminPermission(BasePermission):
+    fresh_role = True
+
     async def has_required_permissions(self, request: Request) -> bool:
         return self.role in [UserRole.super_admin, UserRole.admin]
@@ -1,5 +1,8 @@
-from ..models import UserLogin, UserRegister, LivezenUser, UserCreate, UserUpdate, hash_password
+from livezen.core.security import password_hasher
+
+from ..models import UserLogin, UserRegister, LivezenUser, UserCreate, UserUpdate
 from ..repository import UserRepository
+from ..utils import invalidate_user
 
 
 class AuthService:
@@ -7,10 +10,17 @@ class AuthService:
         self.repository = repository
 
     async def register(self, user_in: UserRegister) -> LivezenUser:
-        hashed_password = hash_password(user_in.password)
+        hashed_password = await password_hasher.hash(user_in.password)
         user_data = user_in.model_dump()
         user_data["password"] = hashed_password
         return await self.repository.create(**user_data)
 
     async def authenticate(self, credentials: UserLogin) -> LivezenUser | None:
-        return await self.repository.get(email=credentials.email)
+        user = await self.repository.get(email=credentials.email)
+        if not user or not await password_hasher.verify(credentials.password, user.password):
+            return None
+        # Upgrade hashes made with an older work factor while we have the plain password
+        if password_hasher.needs_rehash(user.password):
+            await self.repository.update(user, password=await password_hasher.hash(credentials.password))
+            invalidate_user(user.id)
+        return user
@@ -4,6 +4,7 @@ from uuid import UUID
 from livezen.auth.models import Profile
 
 from ..repository import ProfileRepository, UserRepository
+from ..utils import invalidate_user
 
 
 class ProfileService:
@@ -12,11 +13,15 @@ class ProfileService:
         self.user_repository = user_repository
 
     async def create(self, user_id: UUID, data: dict[str, Any]) -> Profile:
-        return await self.repository.create(user_id=user_id, **data)
+        profile = await self.repository.create(user_id=user_id, **data)
+        invalidate_user(user_id)
+        return profile
 
     async def update(self, profile: Profile, data: dict[str, Any]) -> Profile:
         """Updates a profile."""
-        return await self.repository.update(profile, **data)
+        profile = await self.repository.update(profile, **data)
+        invalidate_user(profile.user_id)
+        return profile
 
     async def get_by_user(self, user_id: UUID) -> Profile | None:
         return await self.repository.get(user_id=user_id)
@@ -1,10 +1,13 @@
-from typing import Any, List, Tuple
+from typing import Any, List, Optional, Tuple
 from fastapi.security import OAuth2PasswordBearer
 from tortoise.expressions import Q
 from uuid import UUID
 
+from livezen.core.security import password_hasher
+from livezen.enums import TotalMode
 
 from ..models import LivezenUser, UserCreate, UserUpdate
+from ..utils import invalidate_user
 from ..repository import UserRepository
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
@@ -15,9 +18,14 @@ class UserService:
         self.repository = repository
 
     async def paginated(
-        self, page: int, page_size: int, search: Q = Q(), order: list = []
-    ) -> Tuple[int, List[LivezenUser]]:
-        return await self.repository.paginated(page, page_size, search, order)
+        self, page: int, page_size: int, search: Q = Q(), order: list = [], total: TotalMode = TotalMode.exact
+    ) -> Tuple[Optional[int], List[LivezenUser]]:
+        return await self.repository.paginated(page, page_size, search, order, prefetch=['profile'], total_mode=total)
+
+    async def cursor_paginated(
+        self, page_size: int, after: Optional[str] = None, search: Q = Q(), order: list = []
+    ) -> Tuple[List[LivezenUser], Optional[str]]:
+        return await self.repository.keyset_paginated(page_size, after, search, order, prefetch=['profile'])
 
     async def list_users(self) -> list[LivezenUser]:
         return await self.repository.list()
@@ -35,19 +43,25 @@ class UserService:
         return await self.repository.get(email=email)
 
     async def create(self, user_in: UserCreate) -> LivezenUser:
-        return await self.repository.create(**user_in.model_dump())
+        user_data = user_in.model_dump()
+        user_data["password"] = await password_hasher.hash(user_in.password)
+        return await self.repository.create(**user_data)
 
     async def get_or_create(self, email: str, user_in: UserCreate) -> LivezenUser:
         if email:
             instance = await self.repository.get(email=email)
         if instance:
             return instance
-        return await self.repository.create(**user_in.model_dump())
+        return await self.create(user_in)
 
     async def update(self, user: LivezenUser, data: dict[str, Any]) -> LivezenUser:
         """Updates a user with the given data."""
-        return await self.repository.update(user, **data)
+        user = await self.repository.update(user, **data)
+        invalidate_user(user.id)
+        return user
 
     async def delete(self, user_id: int) -> bool:
         """Deletes a user."""
-        return await self.repository.delete(user_id)
+        deleted = await self.repository.delete(user_id)
+        invalidate_user(user_id)
+        return deleted
@@ -1,4 +1,7 @@
-from typing import Annotated
+import copy
+import math
+import time
+from typing import Annotated, Any, Optional, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, OAuth2PasswordBearer
 from starlette.requests import Request
@@ -6,7 +9,8 @@ from starlette.requests import Request
 import jwt
 from jose import JWTError, jwt
 
-from livezen.config import YMA_JWT_ALG, YMA_JWT_SECRET
+from livezen.cache import TTLCache
+from livezen.config import AUTH_CACHE_SIZE, AUTH_TOKEN_CACHE_TTL, AUTH_USER_CACHE_TTL, YMA_JWT_ALG, YMA_JWT_SECRET
 
 from .models import JWTPayload, LivezenUser
 
@@ -23,19 +27,31 @@ def create_access_token(*, data: JWTPayload):
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 
-async def get_current_user(
-    request: Request,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-) -> LivezenUser:
-    """Get the current authenticated user from the JWT token."""
+# Verified token -> (user id, expiry timestamp); saves re-checking the signature
+_token_cache: TTLCache[Tuple[str, float]] = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_TOKEN_CACHE_TTL)
+# User id -> user with profile prefetched. Never handed out: each request gets its
+# own copy (see _request_copy), so nothing one request sets on it reaches another
+_user_cache: TTLCache[LivezenUser] = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_USER_CACHE_TTL)
 
-    # Extract token from Authorization header
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
 
-    token = auth_header.split(" ")[1]
+def invalidate_user(user_id: Any) -> None:
+    """Drop a cached user; call after any change to the user or its profile."""
+    _user_cache.pop(str(user_id))
+
+
+def _request_copy(user: LivezenUser) -> LivezenUser:
+    user = copy.copy(user)
+    profile = getattr(user, "_profile", None)
+    if profile is not None:
+        user._profile = copy.deepcopy(profile)  # its JSON fields are mutable too
+    return user
+
+
+def _verify_token(token: str) -> str:
+    """Return the user id of a valid token."""
+    cached = _token_cache.get(token)
+    if cached and cached[1] > time.time():
+        return cached[0]
 
     try:
         # Decode JWT
@@ -44,21 +60,60 @@ async def get_current_user(
             YMA_JWT_SECRET,
             algorithms=[YMA_JWT_ALG]
         )
-        # assuming you store user email in "sub"
-        # email: str = payload.get("email")
-        user_id: str = payload.get("user_id")
-        # if email is None:
-        #     raise HTTPException(
-        #         status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    user = await LivezenUser.get_or_none(id=user_id).prefetch_related('profile')
-    if not user:
+    user_id = payload.get("user_id")
+    if not user_id:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    exp = payload.get("exp")
+    _token_cache.set(token, (user_id, float(exp) if exp else math.inf))
+    return user_id
+
 
+async def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> LivezenUser:
+    """Get the current authenticated user from the JWT token."""
+    # Resolved once per request, permissions and dependencies reuse it
+    user = getattr(request.state, "current_user", None)
+    if user is not None:
+        return user
+
+    # Extract token from Authorization header
+    auth_header = request.headers.get("Authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
+
+    token = auth_header.split(" ")[1]
+    user_id = _verify_token(token)
+
+    user = _user_cache.get(user_id)
+    if user is None:
+        user = await LivezenUser.get_or_none(id=user_id).prefetch_related('profile')
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        _user_cache.set(user_id, user)
+
+    user = _request_copy(user)
+    request.state.current_user = user
     return user
 
 CurrentUser = Annotated[LivezenUser, Depends(get_current_user)]
+
+
+async def get_optional_user(request: Request) -> Optional[LivezenUser]:
+    """The current user on routes that also serve anonymous visitors; a bad token counts as anonymous."""
+    if not request.headers.get("Authorization"):
+        return None
+    try:
+        return await get_current_user(request=request)
+    except HTTPException:
+        return None
+
+OptionalUser = Annotated[Optional[LivezenUser], Depends(get_optional_user)]
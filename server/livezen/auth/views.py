@@ -7,11 +7,12 @@ from uuid import UUID
 from livezen.auth.permissions import AdminPermission, PermissionsDependency
 from livezen.auth.utils import CurrentUser, create_access_token
 from livezen.config import YMA_JWT_EXP
-from livezen.core.security import verify_password
+from livezen.core.security import password_hasher
 from livezen.exceptions import ConflictException, ResourceNotFoundException
+from livezen.search import EXACT, SearchField, SearchSpec
 
-from .models import AdminPasswordReset, ChangePasswordResponse, ChangePasswordUserInput, JWTOut, JWTPayload, UpdateEmailUserInput, UserCreate, UserLogin, UserPagination, UserRead, UserReadSimple, UserRegister, UserUpdate, hash_password
-from livezen.enums import UserRole
+from .models import AdminPasswordReset, LivezenUser, ChangePasswordResponse, ChangePasswordUserInput, JWTOut, JWTPayload, UpdateEmailUserInput, UserCreate, UserLogin, UserPagination, UserRead, UserReadSimple, UserRegister, UserUpdate
+from livezen.enums import TotalMode, UserRole
 
 from .repository import UserRepository
 from .repository import ProfileRepository
@@ -95,10 +96,16 @@ def get_me(*, current_user: CurrentUser):
     return current_user
 
 
-# Mapping of special search keys → list of model fields to search
-SEARCH_FIELD_MAPPINGS = {
-    "name": ["first_name", "last_name", "email", "username"],
-}
+# Search keys clients may use, and how each is matched
+SEARCH_FIELDS = SearchSpec(LivezenUser, {
+    "name": SearchField("first_name", "last_name", "email", "username"),
+    "full_name": SearchField("full_name"),
+    "email": SearchField("email"),
+    "username": SearchField("username"),
+    "phone": SearchField("phone"),
+    "role": SearchField("role", lookup=EXACT),
+    "is_active": SearchField("is_active", lookup=EXACT),
+})
 
 
 @user_router.get("", response_model=UserPagination)
@@ -109,41 +116,34 @@ async def paginated_users(
     searchJoin: str = Query(
         "and", description="'and' or 'or' join for multiple search conditions"),
     role: Optional[str] = None,
+    after: Optional[str] = Query(
+        None, description="Cursor from the previous page's next_cursor; pass an empty value to start cursor pagination"),
+    total: TotalMode = Query(
+        TotalMode.exact, description="'exact', 'estimate' (the last counted total, may be stale) or 'none' (skip counting)"),
 ):
-    q = Q()
-    if search:
-        # Example: search="name:english;status:active"
-        filters = search.split(";")
-        for f in filters:
-            try:
-                field, value = f.split(":", 1)
-
-                if field in SEARCH_FIELD_MAPPINGS:
-                    # Build OR condition for all mapped fields
-                    condition = Q()
-                    for mapped_field in SEARCH_FIELD_MAPPINGS[field]:
-                        condition |= Q(**{f"{mapped_field}__icontains": value})
-                else:
-                    # Normal single-field search
-                    lookup = {f"{field}__icontains": value}
-                    condition = Q(**lookup)
-
-                if searchJoin.lower() == "or":
-                    q |= condition
-                else:
-                    q &= condition
-            except ValueError:
-                continue  # skip invalid filter format
+    # Example: search="name:john;role:admin"
+    q = SEARCH_FIELDS.compile(search, searchJoin).q
     if role:
         q = Q(role=role)
 
-    total, data = await user_service.paginated(page=page, page_size=page_size, search=q)
+    if after is not None:
+        # Keyset mode: no COUNT and no OFFSET, page cost stays flat
+        data, next_cursor = await user_service.cursor_paginated(page_size=page_size, after=after, search=q)
+        return UserPagination(
+            data=data,
+            itemsPerPage=10,
+            page=page,
+            perPage=page_size,
+            next_cursor=next_cursor,
+        )
+
+    total_count, data = await user_service.paginated(page=page, page_size=page_size, search=q, total=total)
     return UserPagination(
         data=data,
         itemsPerPage=10,
         page=page,
         perPage=page_size,
-        total=total,
+        total=total_count,
     )
 
 
@@ -257,23 +257,22 @@ async def change_password(
 
     """Change user password"""
     # 1️⃣ Verify old password
-    if not verify_password(data_in.oldPassword, current_user.password):
+    if not await password_hasher.verify(data_in.oldPassword, current_user.password):
         return ChangePasswordResponse(
             success=False,
             message="Old password is incorrect."
         )
 
     # 2️⃣ Prevent using the same password again
-    if verify_password(data_in.newPassword, current_user.password):
+    if await password_hasher.verify(data_in.newPassword, current_user.password):
         return ChangePasswordResponse(
             success=False,
             message="New password must be different from the old password."
         )
 
     # 3️⃣ Hash new password and update
-    hashed_new_password = hash_password(data_in.newPassword)
-    user.password = hashed_new_password
-    await user.save()
+    hashed_new_password = await password_hasher.hash(data_in.newPassword)
+    await user_service.update(user=user, data={"password": hashed_new_password})
 
     # 4️⃣ Return success
     return ChangePasswordResponse(
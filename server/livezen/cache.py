@@ -0,0 +1,87 @@
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, Optional, Tuple, TypeVar
+
+from tortoise.expressions import Q
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[V]):
+    """
+    Small in-process LRU cache whose entries expire after `ttl` seconds.
+
+    Usage:
+        cache = TTLCache(maxsize=1024, ttl=30)
+        cache.set("key", value)
+        cache.get("key")                 # None once expired
+        cache.get("key", max_age=300)    # accept older (stale) entries
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Optional[V] = None, max_age: Optional[float] = None) -> Optional[V]:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        stored_at, value = entry
+        if time.monotonic() - stored_at > (self.ttl if max_age is None else max_age):
+            if max_age is None or max_age >= self.ttl:
+                del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def q_key(q: Optional[Q]) -> Hashable:
+    """
+    Normalized, hashable representation of a Q tree.
+
+    Empty nodes are dropped and siblings are sorted, so filters that only differ
+    in the order they were combined map to the same key.
+    """
+    if q is None:
+        return ()
+    children = tuple(sorted(
+        (key for key in (q_key(child) for child in q.children) if key != ()),
+        key=repr,
+    ))
+    filters = tuple(sorted((name, _freeze(value)) for name, value in q.filters.items()))
+    if not filters and not q._is_negated and len(children) == 1:
+        return children[0]
+    if not filters and not children:
+        return ()
+    return (q.join_type, q._is_negated, filters, children)
@@ -0,0 +1,101 @@
+"""
+In-process snapshot of the catalog reference tables (types, categories, tags).
+
+These tables change rarely but are read on almost every storefront page, so
+they are loaded once at startup and rebuilt by the Type/Category/Tag services
+after every write. Readers always see one complete, immutable snapshot.
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from livezen.category.models import Category, CategoryRead, CategoryReadSimple, CategoryTreeRead
+from livezen.tag.models import Tag, TagRead
+from livezen.type.models import Type, TypeRead
+
+log = logging.getLogger(__name__)
+
+
+class CatalogSnapshot:
+    """Immutable view of the reference tables with O(1) lookups by id and slug."""
+
+    def __init__(self, version: int, types: List[Type], categories: List[Category], tags: List[Tag]):
+        self.version = version
+
+        self.types: List[TypeRead] = [TypeRead.model_validate(t) for t in types]
+        self.types_by_id: Dict[int, TypeRead] = {t.id: t for t in self.types}
+        self.types_by_slug: Dict[str, TypeRead] = {}
+        for t in self.types:
+            self.types_by_slug.setdefault(t.slug, t)
+
+        children_by_parent: Dict[int, List[Category]] = {}
+        for category in categories:
+            children_by_parent.setdefault(category.parent_id, []).append(category)
+
+        trees: Dict[int, CategoryTreeRead] = {}
+
+        def tree(category: Category, path: frozenset) -> CategoryTreeRead:
+            if category.id not in trees:
+                children = [
+                    tree(child, path | {child.id})
+                    for child in children_by_parent.get(category.id, [])
+                    if child.id not in path  # guard against parent cycles
+                ]
+                trees[category.id] = CategoryTreeRead(
+                    **CategoryReadSimple.model_validate(category).model_dump(), children=children)
+            return trees[category.id]
+
+        categories_by_id = {category.id: category for category in categories}
+        self.categories_by_id: Dict[int, CategoryRead] = {}
+        self.categories_by_slug: Dict[str, CategoryRead] = {}
+        for category in categories:
+            parent = categories_by_id.get(category.parent_id)
+            read = CategoryRead(
+                **CategoryReadSimple.model_validate(category).model_dump(),
+                type=self.types_by_id[category.type_id],
+                parent=CategoryReadSimple.model_validate(parent) if parent else None,
+                translated_languages=category.translated_languages or [],
+                children=tree(category, frozenset({category.id})).children,
+            )
+            self.categories_by_id[read.id] = read
+            self.categories_by_slug.setdefault(read.slug, read)
+
+        self.tags_by_id: Dict[int, TagRead] = {}
+        self.tags_by_slug: Dict[str, TagRead] = {}
+        for tag in tags:
+            read = TagRead(
+                id=tag.id, name=tag.name, icon=tag.icon, slug=tag.slug,
+                type_id=tag.type_id, type=self.types_by_id[tag.type_id],
+            )
+            self.tags_by_id[read.id] = read
+            self.tags_by_slug.setdefault(read.slug, read)
+
+
+class Catalog:
+    """Holder of the current `CatalogSnapshot`."""
+
+    def __init__(self):
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.snapshot is not None
+
+    async def reload(self) -> CatalogSnapshot:
+        """Rebuild the snapshot from the database (three queries) and swap it in."""
+        async with self._lock:
+            self._version += 1
+            types = await Type.all().order_by("id")
+            categories = await Category.all().order_by("id")
+            tags = await Tag.all().order_by("id")
+            self.snapshot = CatalogSnapshot(self._version, types, categories, tags)
+            log.debug("Catalog snapshot v%s loaded", self._version)
+            return self.snapshot
+
+    def clear(self) -> None:
+        self.snapshot = None
+
+
+catalog = Catalog()
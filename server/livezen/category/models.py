@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 from tortoise import fields, models
 
 from livezen.models import Pagination
@@ -9,7 +9,7 @@ from livezen.type.models import Type, TypeRead
 class Category(models.Model):
     id = fields.BigIntField(pk=True, index=True)
     name = fields.CharField(max_length=20, unique=True)
-    slug = fields.CharField(max_length=20)
+    slug = fields.CharField(max_length=20, index=True)
     details = fields.TextField(null=True)
     icon = fields.CharField(max_length=20)
     image = fields.JSONField(null=True)
@@ -55,13 +55,20 @@ class CategoryReadSimple(CategoryBase):
     slug: str
 
 
+class CategoryTreeRead(CategoryReadSimple):
+    # `children_tree` is attached by CategoryRepository.load_trees
+    children: list["CategoryTreeRead"] = Field(
+        default=[], validation_alias=AliasChoices("children_tree", "children"))
+
+
 class CategoryRead(CategoryBase):
     id: int
     slug: str
     type: TypeRead
     parent: Optional[CategoryReadSimple] = None
     translated_languages: list[str]
-    children: Optional[list[CategoryReadSimple]] = []
+    children: Optional[list[CategoryTreeRead]] = Field(
+        default=[], validation_alias=AliasChoices("children_tree", "children"))
 
 
 class CategoryPagination(Pagination):
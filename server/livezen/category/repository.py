@@ -1,8 +1,45 @@
+from typing import Dict, Iterable, List
+
 from livezen.repository import BaseRepository
 
 from .models import Category
 
 
 class CategoryRepository(BaseRepository[Category]):
+    versioned = True
+
     def __init__(self):
         super().__init__(Category)
+
+    async def descendants(self, category_ids: Iterable[int]) -> List[Category]:
+        """
+        Load every descendant (children, grandchildren, ...) of the given
+        categories in a single recursive query, whatever the depth of the tree.
+        """
+        ids = sorted({int(category_id) for category_id in category_ids})
+        if not ids:
+            return []
+        table = self.model._meta.db_table
+        # UNION (not UNION ALL) stops at rows already visited, so a bad parent cycle cannot loop
+        sql = (
+            f"WITH RECURSIVE tree(id) AS ("
+            f"SELECT id FROM {table} WHERE parent_id IN ({', '.join(map(str, ids))}) "
+            f"UNION SELECT c.id FROM {table} c JOIN tree t ON c.parent_id = t.id"
+            f") SELECT {table}.* FROM {table} JOIN tree ON {table}.id = tree.id ORDER BY {table}.id"
+        )
+        return list(await self.model.raw(sql))
+
+    async def load_trees(self, categories: List[Category]) -> List[Category]:
+        """
+        Attach the full subtree of each category as `children_tree`.
+
+        Nodes are linked in memory from one `descendants` query, so a page of N
+        categories costs one query instead of one per category.
+        """
+        children_by_parent: Dict[int, List[Category]] = {}
+        for descendant in await self.descendants(category.id for category in categories):
+            children_by_parent.setdefault(descendant.parent_id, []).append(descendant)
+            descendant.children_tree = children_by_parent.setdefault(descendant.id, [])
+        for category in categories:
+            category.children_tree = children_by_parent.get(category.id, [])
+        return categories
@@ -1,8 +1,14 @@
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from slugify import slugify
 from tortoise.expressions import Q
 
-from .models import Category, CategoryCreate, CategoryUpdate
+from livezen.catalog import catalog
+from livezen.enums import TotalMode
+from livezen.product.models import Product
+from livezen.product.related import related_index
+from livezen.product.search import search_index
+
+from .models import Category, CategoryCreate, CategoryRead, CategoryUpdate
 from .repository import CategoryRepository
 
 
@@ -11,24 +17,21 @@ class CategoryService:
         self.repository = repository
 
     async def paginated(
-        self, page: int, page_size: int, search: Q = Q(), order: list = []
-    ) -> Tuple[int, List[Category]]:
+        self, page: int, page_size: int, search: Q = Q(), order: list = [], total: TotalMode = TotalMode.exact
+    ) -> Tuple[Optional[int], List[Category]]:
         total, categories = await self.repository.paginated(
-            page, page_size, search, order, prefetch=['type', 'parent', 'children']
+            page, page_size, search, order, prefetch=['type', 'parent'], total_mode=total
+        )
+        return total, await self.repository.load_trees(categories)
+
+    async def cursor_paginated(
+        self, page_size: int, after: Optional[str] = None, search: Q = Q(), order: list = []
+    ) -> Tuple[List[Category], Optional[str]]:
+        categories, next_cursor = await self.repository.keyset_paginated(
+            page_size, after, search, order, prefetch=['type', 'parent']
         )
+        return await self.repository.load_trees(categories), next_cursor
 
-        # Embed children categories for top-level categories
-        result = []
-        for category in categories:
-            if category.parent_id is None:
-                children = await category.children.all().prefetch_related('type', 'parent')
-                category.children_list = list(children)
-                result.append(category)
-            else:
-                result.append(category)
-
-        return total, result
-    
     async def get(self, category_id: int) -> Category | None:
         """Gets a category by id."""
         return await self.repository.get(id=category_id)
@@ -37,22 +40,41 @@ class CategoryService:
         """Gets a category by name."""
         return await self.repository.get(name=name)
 
-    async def get_by_slug(self, slug: str) -> Category | None:
-        """Gets a category by slug."""
-        return await self.repository.get(slug=slug, prefetch=['type', 'parent', 'children'])
+    async def get_by_slug(self, slug: str) -> Category | CategoryRead | None:
+        """Gets a category by slug, with its subtree."""
+        if catalog.loaded:
+            return catalog.snapshot.categories_by_slug.get(slug)
+        category = await self.repository.get(slug=slug, prefetch=['type', 'parent'])
+        if not category:
+            return None
+        await self.repository.load_trees([category])
+        return category
 
     async def create(self, category_in: CategoryCreate) -> Category:
         slug = slugify(category_in.name)
-        return await self.repository.create(
+        category = await self.repository.create(
             **category_in.model_dump(exclude={"slug"}),
             slug=slug,
             translated_languages=["en"]
         )
+        await catalog.reload()
+        return category
 
     async def update(self, category: Category, category_in: CategoryUpdate) -> Category:
         """Updates a category."""
-        return await self.repository.update(category, **category_in.model_dump(exclude_unset=True))
+        renamed = category_in.name != category.name
+        category = await self.repository.update(category, **category_in.model_dump(exclude_unset=True))
+        if renamed:
+            await search_index.reindex_category(category.id)
+        await catalog.reload()
+        return category
 
     async def delete(self, category_id: int) -> bool:
         """Deletes a category."""
-        return await self.repository.delete(category_id)
+        product_ids = await Product.filter(categories__id=category_id).values_list("id", flat=True)
+        deleted = await self.repository.delete(category_id)
+        if deleted:
+            related_index.remove_category(category_id)
+            await search_index.index_products(product_ids)
+        await catalog.reload()
+        return deleted
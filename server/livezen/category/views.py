@@ -1,19 +1,33 @@
 from typing import Optional
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query
 from tortoise.expressions import Q
 
+from livezen.conditional import Conditional
+from livezen.enums import TotalMode
 from livezen.exceptions import ConflictException, ResourceNotFoundException
+from livezen.search import EXACT, SearchField, SearchSpec
+from livezen.type.models import Type
 
-from .models import CategoryCreate, CategoryPagination, CategoryRead, CategoryReadSimple, CategoryUpdate
+from .models import Category, CategoryCreate, CategoryPagination, CategoryRead, CategoryReadSimple, CategoryUpdate
 from .repository import CategoryRepository
 from .service import CategoryService
 
 
 router = APIRouter()
 service = CategoryService(CategoryRepository())
+conditional = Conditional(Category, Type)
 
+# Search keys clients may use, and how each is matched
+SEARCH_FIELDS = SearchSpec(Category, {
+    "name": SearchField("name"),
+    "details": SearchField("details"),
+    "slug": SearchField("slug", lookup=EXACT),
+    "type.slug": SearchField("type__slug", lookup=EXACT),
+    "parent.slug": SearchField("parent__slug", lookup=EXACT),
+})
 
-@router.get("", response_model=CategoryPagination)
+
+@router.get("", response_model=CategoryPagination, dependencies=[Depends(conditional)])
 async def paginated_categorys(
     parent: Optional[str] = None,
     page: int = Query(1, description="Page Number"),
@@ -21,28 +35,13 @@ async def paginated_categorys(
     search: Optional[str] = Query("", description="Subject Name for Search"),
     searchJoin: str = Query(
         "and", description="'and' or 'or' join for multiple search conditions"),
+    after: Optional[str] = Query(
+        None, description="Cursor from the previous page's next_cursor; pass an empty value to start cursor pagination"),
+    total: TotalMode = Query(
+        TotalMode.exact, description="'exact', 'estimate' (the last counted total, may be stale) or 'none' (skip counting)"),
 ):
-    q = Q()
-    if search:
-        # Example: search="name:english;status:active"
-        filters = search.split(";")
-        for f in filters:
-            try:
-                field, value = f.split(":", 1)
-
-                # ✅ Support nested related lookups like 'type.slug'
-                field_path = field.replace(".", "__")
-
-                # Build lookup dynamically
-                lookup = {f"{field_path}__icontains": value}
-                condition = Q(**lookup)
-
-                if searchJoin.lower() == "or":
-                    q |= condition
-                else:
-                    q &= condition
-            except ValueError:
-                continue  # skip invalid filter format
+    # Example: search="name:english;type.slug:grocery"
+    q = SEARCH_FIELDS.compile(search, searchJoin).q
 
     # 🧩 Handle parent filter independently
     if parent == "null":
@@ -52,20 +51,34 @@ async def paginated_categorys(
         # Fetch subcategories of a specific parent
         q &= Q(parent_id=parent)
 
-    total, data = await service.paginated(page=page, page_size=limit, search=q)
+    if after is not None:
+        # Keyset mode: no COUNT and no OFFSET, page cost stays flat
+        data, next_cursor = await service.cursor_paginated(page_size=limit, after=after, search=q)
+        return CategoryPagination(
+            data=data,
+            itemsPerPage=10,
+            page=page,
+            perPage=limit,
+            next_cursor=next_cursor,
+        )
+
+    total_count, data = await service.paginated(page=page, page_size=limit, search=q, total=total)
     return CategoryPagination(
         data=data,
         itemsPerPage=10,
         page=page,
         perPage=limit,
-        total=total,
+        total=total_count,
     )
 
 
-@router.get("/{slug}", response_model=CategoryRead)
+@router.get("/{slug}", response_model=CategoryRead, dependencies=[Depends(conditional)])
 async def get_category(slug: str):
     """Get a category by its slug."""
     category = await service.get_by_slug(slug)
+    if not category:
+        raise ResourceNotFoundException(
+            "A category with this slug does not exist.")
     return category
 
 
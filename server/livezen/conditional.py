@@ -0,0 +1,158 @@
+"""
+Conditional GET for read endpoints.
+
+Every write through a `versioned` repository bumps the written table's row in
+`table_version`, in the write's transaction. A cacheable route declares the
+tables its payload is built from (their repositories must be `versioned`); the `Conditional` dependency derives a weak ETag and Last-Modified from
+their versions and answers `If-None-Match` / `If-Modified-Since` with a 304
+before the endpoint runs a query or serializes anything.
+
+    product_cache = Conditional(Product, Category, Tag, Type)
+
+    @router.get("", dependencies=[Depends(product_cache)])
+"""
+import hashlib
+import logging
+import time
+from datetime import datetime, timezone as dt_timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from fastapi import Request, Response
+from tortoise import timezone
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import F
+from tortoise.models import Model
+from tortoise.transactions import in_transaction
+
+from livezen.config import CACHE_CONTROL, TABLE_VERSION_TTL, WRITE_CONNECTION
+from livezen.db import read_db
+from livezen.models import TableVersion
+
+log = logging.getLogger(__name__)
+
+
+class NotModified(Exception):
+    """Raised by `Conditional` to answer with a 304; handled in main.py."""
+
+    def __init__(self, headers: Dict[str, str]):
+        self.headers = headers
+        super().__init__("Not modified")
+
+
+class TableVersions:
+    """Reads and bumps `table_version`, keeping reads for TABLE_VERSION_TTL seconds."""
+
+    def __init__(self, ttl: float = TABLE_VERSION_TTL):
+        self.ttl = ttl
+        self._cache: Dict[str, Tuple[float, int, Optional[datetime]]] = {}
+
+    async def get(self, tables: Iterable[str]) -> Dict[str, Tuple[int, Optional[datetime]]]:
+        """(version, updated_at) per table; tables never written are (0, None)."""
+        now = time.monotonic()
+        tables = list(tables)
+        stale = [table for table in tables if now - self._cache.get(table, (-self.ttl - 1,))[0] > self.ttl]
+        if stale:
+            found = {
+                table: (version, updated_at)
+                for table, version, updated_at in await TableVersion.filter(table__in=stale)
+                .using_db(read_db()).values_list("table", "version", "updated_at")
+            }
+            for table in stale:
+                self._cache[table] = (now, *found.get(table, (0, None)))
+        return {table: self._cache[table][1:] for table in tables}
+
+    async def bump(self, table: str) -> None:
+        self._cache.pop(table, None)
+        updated = await TableVersion.filter(table=table).update(
+            version=F("version") + 1, updated_at=timezone.now())
+        if not updated:
+            try:
+                # In a savepoint: a failed INSERT would abort the write's transaction on Postgres
+                async with in_transaction(WRITE_CONNECTION):
+                    await TableVersion.create(table=table, version=1)
+            except IntegrityError:  # created concurrently
+                await TableVersion.filter(table=table).update(
+                    version=F("version") + 1, updated_at=timezone.now())
+
+
+table_versions = TableVersions()
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+class Conditional:
+    """
+    Route dependency adding ETag, Last-Modified, Cache-Control and Surrogate-Key
+    headers, and short-circuiting with a 304 when the client copy is current.
+
+    Args:
+        *models: Models whose tables the response is built from.
+        cache_control: Cache-Control value for the route.
+        surrogate_keys: Keys the edge can purge on; defaults to the table names.
+        personalize: For routes whose payload also depends on the caller: returns a
+            short token of that caller's state (None for anonymous requests). The
+            token goes into the ETag, and personalized responses are private and
+            carry no Last-Modified.
+    """
+
+    def __init__(
+        self,
+        *models: Type[Model],
+        cache_control: str = CACHE_CONTROL,
+        surrogate_keys: Optional[List[str]] = None,
+        personalize: Optional[Callable[[Request], Awaitable[Optional[str]]]] = None,
+    ):
+        self.tables = [model._meta.db_table for model in models]
+        self.cache_control = cache_control
+        self.surrogate_keys = " ".join(surrogate_keys or self.tables)
+        self.personalize = personalize
+
+    async def __call__(self, request: Request, response: Response) -> None:
+        if request.method not in ("GET", "HEAD"):
+            return
+
+        versions = await table_versions.get(self.tables)
+        state = ",".join(f"{table}:{versions[table][0]}" for table in self.tables)
+        personal = await self.personalize(request) if self.personalize else None
+        if personal is not None:
+            state += f"|{personal}"
+        digest = hashlib.sha1(f"{request.url.path}?{request.url.query}|{state}".encode()).hexdigest()[:20]
+        headers = {
+            "ETag": f'W/"{digest}"',
+            "Cache-Control": self.cache_control if personal is None else "private, no-cache",
+            "Surrogate-Key": self.surrogate_keys,
+        }
+        if self.personalize:
+            headers["Vary"] = "Authorization"
+        last_modified = None
+        if personal is None:
+            last_modified = max((updated_at for _, updated_at in versions.values() if updated_at), default=None)
+        if last_modified:
+            if last_modified.tzinfo is None:  # stored as UTC when USE_TZ is off
+                last_modified = last_modified.replace(tzinfo=dt_timezone.utc)
+            last_modified = last_modified.astimezone(dt_timezone.utc)
+            headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+        if self._not_modified(request, headers["ETag"], last_modified):
+            raise NotModified(headers)
+        response.headers.update(headers)
+
+    @staticmethod
+    def _not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            return etag_matches(if_none_match, etag)
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and last_modified:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            # HTTP dates have second precision
+            return last_modified.replace(microsecond=0) <= since
+        return False
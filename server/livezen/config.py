@@ -9,45 +9,156 @@ log = logging.getLogger(__name__)
 
 load_dotenv()
 
-# DB_USER = os.getenv("DB_USER")
-# DB_PASSWORD = os.getenv("DB_PASSWORD")
-# DB_HOST = os.getenv("DB_HOST")
-# DB_PORT = os.getenv("DB_PORT")
-# DB_NAME = os.getenv("DB_NAME")
-
 PROJECT_ROOT: str = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
 BASE_DIR: str = os.path.abspath(os.path.join(PROJECT_ROOT, os.pardir))
 
+config = Config(".env")
+
+# Database
+DB_ENGINE = config("DB_ENGINE", default="sqlite")  # sqlite | postgres | mysql
+DB_FILE = config("DB_FILE", default=f"{BASE_DIR}/db.sqlite3")  # sqlite only
+DB_USER = config("DB_USER", default="")
+DB_PASSWORD = config("DB_PASSWORD", default="")
+DB_HOST = config("DB_HOST", default="localhost")
+DB_PORT = config("DB_PORT", cast=int, default=5432 if DB_ENGINE == "postgres" else 3306)
+DB_NAME = config("DB_NAME", default="livezen")
+DB_READ_HOST = config("DB_READ_HOST", default="")  # Read replica, reads go to DB_HOST when empty
+DB_READ_PORT = config("DB_READ_PORT", cast=int, default=DB_PORT)
+DB_POOL_MIN = config("DB_POOL_MIN", cast=int, default=1)
+DB_POOL_MAX = config("DB_POOL_MAX", cast=int, default=10)
+DB_STATEMENT_CACHE_SIZE = config("DB_STATEMENT_CACHE_SIZE", cast=int, default=100)  # postgres only
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", cast=int, default=300)  # Seconds before an idle pooled connection is closed
+
+# SQLite profile, applied as PRAGMAs when each connection opens
+SQLITE_PRAGMAS = {
+    "busy_timeout": config("SQLITE_BUSY_TIMEOUT", cast=int, default=5000),  # ms to wait on a lock held by another process
+    "journal_mode": config("SQLITE_JOURNAL_MODE", default="WAL"),  # readers never block the writer
+    "synchronous": config("SQLITE_SYNCHRONOUS", default="NORMAL"),  # durable in WAL mode, fsync only on checkpoint
+    "mmap_size": config("SQLITE_MMAP_SIZE", cast=int, default=256 * 1024 * 1024),  # bytes
+    "cache_size": config("SQLITE_CACHE_SIZE", cast=int, default=-64000),  # negative = KiB, per connection
+    "temp_store": "MEMORY",
+}
+SQLITE_READERS = config("SQLITE_READERS", cast=int, default=4)  # Read-only connections next to the single writer
+
+DB_ENGINES = {
+    "sqlite": "tortoise.backends.sqlite",
+    "postgres": "tortoise.backends.asyncpg",
+    "mysql": "tortoise.backends.mysql",
+}
+if DB_ENGINE not in DB_ENGINES:
+    raise ValueError(f"DB_ENGINE must be one of {', '.join(DB_ENGINES)}, got {DB_ENGINE!r}")
+
+WRITE_CONNECTION = "default"
+READ_CONNECTION = "replica"
+
+
+def db_connection(host: str = DB_HOST, port: int = DB_PORT, read_only: bool = False) -> dict:
+    """Tortoise connection settings for the configured engine."""
+    if DB_ENGINE == "sqlite":
+        credentials = {"file_path": DB_FILE, **SQLITE_PRAGMAS}  # Path to SQLite database file
+        if read_only:
+            credentials["query_only"] = "ON"
+    else:
+        credentials = {
+            "host": host,
+            "port": port,
+            "user": DB_USER,
+            "password": DB_PASSWORD,
+            "database": DB_NAME,
+            "minsize": DB_POOL_MIN,
+            "maxsize": DB_POOL_MAX,
+        }
+        if DB_ENGINE == "postgres":
+            credentials["statement_cache_size"] = DB_STATEMENT_CACHE_SIZE
+            credentials["max_inactive_connection_lifetime"] = DB_POOL_RECYCLE
+        else:
+            credentials["pool_recycle"] = DB_POOL_RECYCLE
+    return {"engine": DB_ENGINES[DB_ENGINE], "credentials": credentials}
+
+
+DB_CONNECTIONS = {WRITE_CONNECTION: db_connection()}
+if DB_ENGINE == "sqlite":
+    # One connection writes, so writers queue in-process instead of failing with
+    # "database is locked"; WAL lets the read-only connections run alongside it
+    if DB_FILE != ":memory:":
+        for i in range(SQLITE_READERS):
+            DB_CONNECTIONS[f"{READ_CONNECTION}_{i}"] = db_connection(read_only=True)
+elif DB_READ_HOST:
+    DB_CONNECTIONS[READ_CONNECTION] = db_connection(DB_READ_HOST, DB_READ_PORT)
+READ_CONNECTIONS = [name for name in DB_CONNECTIONS if name != WRITE_CONNECTION]
 
 TORTOISE_ORM = {
-    "connections": {
-        # SQLite configuration
-        "sqlite": {
-            "engine": "tortoise.backends.sqlite",
-            "credentials": {"file_path": f"{BASE_DIR}/db.sqlite3"},  # Path to SQLite database file
-        },
-        # "default": f"mysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    },
+    "connections": DB_CONNECTIONS,
     "apps": {
         "models": {
             # include all your domain model modules
             "models": [
+                "livezen.models",
                 "livezen.auth.models",
                 "livezen.type.models",
                 "livezen.category.models",
                 "livezen.product.models",
                 "livezen.tag.models",
                 "livezen.wishlist.models",
+                "livezen.settings.models",
                 "aerich.models"  # 👈 Aerich needs this
             ],
-            "default_connection": "sqlite",
+            "default_connection": WRITE_CONNECTION,
         },
     },
 }
 
-config = Config(".env")
-
 LOG_LEVEL = config("LOG_LEVEL", default=logging.WARNING)
 YMA_JWT_SECRET = config("YMA_JWT_SECRET", default="secret-key")
 YMA_JWT_ALG = config("YMA_JWT_ALG", default="HS256")
 YMA_JWT_EXP = config("YMA_JWT_EXP", cast=int, default=86400)  # Seconds
+
+# get_current_user caches
+AUTH_TOKEN_CACHE_TTL = config("AUTH_TOKEN_CACHE_TTL", cast=float, default=300)  # Seconds a verified token is trusted
+AUTH_USER_CACHE_TTL = config("AUTH_USER_CACHE_TTL", cast=float, default=60)  # Seconds a user is reused between requests
+AUTH_CACHE_SIZE = config("AUTH_CACHE_SIZE", cast=int, default=10000)
+
+# Password hashing
+PASSWORD_HASH_ROUNDS = config("PASSWORD_HASH_ROUNDS", cast=int, default=12)  # bcrypt cost, existing hashes are upgraded on login
+PASSWORD_HASH_WORKERS = config("PASSWORD_HASH_WORKERS", cast=int, default=min(4, os.cpu_count() or 1))
+PASSWORD_HASH_MAX_PENDING = config("PASSWORD_HASH_MAX_PENDING", cast=int, default=64)  # Queued + running calls before 503
+
+# Paginated list totals
+COUNT_CACHE_TTL = config("COUNT_CACHE_TTL", cast=float, default=30)  # Seconds an exact total is reused
+COUNT_CACHE_STALE_TTL = config("COUNT_CACHE_STALE_TTL", cast=float, default=600)  # Seconds a total may serve `total=estimate`
+COUNT_CACHE_SIZE = config("COUNT_CACHE_SIZE", cast=int, default=2048)
+
+RELATED_PRODUCTS_LIMIT = config("RELATED_PRODUCTS_LIMIT", cast=int, default=10)
+RELATED_PRODUCTS_WARM = config("RELATED_PRODUCTS_WARM", cast=int, default=10000)  # Newest products ranked in the background after startup (0: only on first view)
+SETTINGS_RECHECK_INTERVAL = config("SETTINGS_RECHECK_INTERVAL", cast=float, default=5)  # Seconds between settings version checks
+
+# Conditional GET
+TABLE_VERSION_TTL = config("TABLE_VERSION_TTL", cast=float, default=1)  # Seconds table versions are reused before re-reading them
+CACHE_CONTROL = config("CACHE_CONTROL", default="public, no-cache")  # Default for cacheable GET routes
+
+# JSON responses
+JSON_STREAM_CHUNK_SIZE = config("JSON_STREAM_CHUNK_SIZE", cast=int, default=500)  # Items encoded per streamed chunk
+JSON_STREAM_THRESHOLD = config("JSON_STREAM_THRESHOLD", cast=int, default=500)  # List pages this long are streamed
+
+# Bulk product import
+IMPORT_BATCH_SIZE = config("IMPORT_BATCH_SIZE", cast=int, default=500)  # Rows validated and inserted per transaction
+IMPORT_MAX_ERRORS = config("IMPORT_MAX_ERRORS", cast=int, default=1000)  # Row errors listed in the report (all are counted)
+
+# Catalog export
+EXPORT_CHUNK_SIZE = config("EXPORT_CHUNK_SIZE", cast=int, default=500)  # Products read, hydrated and encoded per step
+
+# Wishlist membership cache
+WISHLIST_CACHE_TTL = config("WISHLIST_CACHE_TTL", cast=float, default=30)  # Seconds a user's wishlist ids are reused (other workers' toggles show up after this)
+WISHLIST_CACHE_MAX_BYTES = config("WISHLIST_CACHE_MAX_BYTES", cast=int, default=16 * 1024 * 1024)
+
+# Request metrics (GET /metrics)
+METRICS_ENABLED = config("METRICS_ENABLED", cast=bool, default=False)  # Unauthenticated: only enable where /metrics is not reachable from outside
+METRICS_LOOP_LAG_INTERVAL = config("METRICS_LOOP_LAG_INTERVAL", cast=float, default=0.5)  # Seconds between event loop lag samples
+
+# Per-request SQL instrumentation
+SQL_SERVER_TIMING = config("SQL_SERVER_TIMING", cast=bool, default=False)  # Send query count and DB time in a Server-Timing header (development)
+SQL_QUERY_BUDGET = config("SQL_QUERY_BUDGET", cast=int, default=25)  # Statements per request before a warning, 0 = unlimited
+SQL_REPEAT_LIMIT = config("SQL_REPEAT_LIMIT", cast=int, default=5)  # Runs of one statement shape per request before an N+1 warning, 0 = unlimited
+SQL_STRICT = config("SQL_STRICT", cast=bool, default=False)  # Fail the request instead of warning (development and CI)
+# Wraps the DB clients' execute methods: off unless asked for, or implied by the flags above
+SQL_STATS_ENABLED = config("SQL_STATS_ENABLED", cast=bool, default=SQL_SERVER_TIMING or SQL_STRICT)
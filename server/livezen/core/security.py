@@ -1,10 +1,87 @@
 # core/security.py
-from passlib.context import CryptContext
+"""
+Password hashing off the event loop.
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+bcrypt takes ~100-300 ms of CPU per call, so hashing and verification run in a
+small dedicated thread pool (bcrypt releases the GIL while it works). At most
+PASSWORD_HASH_MAX_PENDING calls may be queued; past that new calls fail fast
+with a 503 instead of piling up behind a burst of logins.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+import bcrypt
+
+from livezen.config import PASSWORD_HASH_MAX_PENDING, PASSWORD_HASH_ROUNDS, PASSWORD_HASH_WORKERS
+from livezen.exceptions import ServiceUnavailableException
+
+R = TypeVar("R")
+
+
+def hash_password(password: str, rounds: int = PASSWORD_HASH_ROUNDS) -> str:
+    """Hash a password using bcrypt and return as string (blocking)."""
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a plain password against the hashed one (blocking)."""
+    try:
+        return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+    except ValueError:  # not a bcrypt hash
+        return False
+
+
+class PasswordHasher:
+    """
+    Async bcrypt service.
+
+    Usage:
+        hashed = await password_hasher.hash("secret")
+        if await password_hasher.verify("secret", hashed):
+            if password_hasher.needs_rehash(hashed): ...
+    """
+
+    def __init__(
+        self,
+        rounds: int = PASSWORD_HASH_ROUNDS,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_pending: int = PASSWORD_HASH_MAX_PENDING,
+    ):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._executor = None
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(verify_password, password, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True when `hashed` was made with a different work factor than the current one."""
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def _run(self, fn: Callable[..., R], *args) -> R:
+        if self._pending >= self.max_pending:
+            raise ServiceUnavailableException("Too many sign-in requests, please try again shortly.")
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+
+
+password_hasher = PasswordHasher()
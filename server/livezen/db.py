@@ -0,0 +1,45 @@
+"""
+Read/write connection routing.
+
+Writes always go to WRITE_CONNECTION. Reads go to the READ_CONNECTIONS (a
+replica, or SQLite's read-only connections) in turn, except inside a
+transaction, where they must see the transaction's own uncommitted writes.
+
+On SQLite the write connection is the single writer: Tortoise runs every
+statement and transaction of a connection under one asyncio lock, so
+concurrent writes queue up in arrival order instead of racing for the file
+lock.
+"""
+from itertools import cycle
+from typing import Type
+
+from tortoise import Model, connections
+from tortoise.backends.base.client import BaseDBAsyncClient, TransactionalDBClient
+
+from livezen.config import READ_CONNECTIONS, WRITE_CONNECTION
+
+_readers = cycle(READ_CONNECTIONS)
+
+
+def write_db() -> BaseDBAsyncClient:
+    return connections.get(WRITE_CONNECTION)
+
+
+def read_db() -> BaseDBAsyncClient:
+    writer = write_db()
+    if not READ_CONNECTIONS or isinstance(writer, TransactionalDBClient):
+        return writer
+    return connections.get(next(_readers))
+
+
+async def ensure_tables(*models: Type[Model]) -> None:
+    """
+    Create the tables of `models` if they don't exist yet (`CREATE TABLE IF NOT EXISTS`).
+
+    For small bookkeeping tables the app can't start without, so a database
+    that predates them keeps working before its next `aerich upgrade`.
+    """
+    db = write_db()
+    generator = db.schema_generator(db)
+    for model in models:
+        await db.execute_script(generator._get_table_sql(model, safe=True)["table_creation_string"])
@@ -16,3 +16,14 @@ class ProductStatus(StrEnum):
 
 class ProductType(StrEnum):
     simple = "simple"
+
+
+class TotalMode(StrEnum):
+    exact = "exact"
+    estimate = "estimate"
+    none = "none"
+
+
+class ExportFormat(StrEnum):
+    ndjson = "ndjson"
+    csv = "csv"
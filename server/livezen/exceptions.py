@@ -28,7 +28,21 @@ class UnauthorizedException(BaseAppException):
         super().__init__(message, status_code=401)
 
 
+class ServiceUnavailableException(BaseAppException):
+    """Raised when the server is too busy to take the request"""
+
+    def __init__(self, message: str):
+        super().__init__(message, status_code=503)
+
+
 class ConflictException(BaseAppException):
     def __init__(self, message: str = "Conflict error", field: str | None = None):
         self.field = field
         super().__init__(message, status_code=409)
+
+
+class QueryBudgetExceeded(BaseAppException):
+    """Raised in SQL_STRICT mode when a request runs too many (or too repetitive) SQL statements"""
+
+    def __init__(self, message: str):
+        super().__init__(message, status_code=500)
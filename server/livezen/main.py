@@ -1,17 +1,28 @@
 import os
 import logging
 
+from contextlib import asynccontextmanager
 from typing import Union
 
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from tortoise.contrib.fastapi import register_tortoise
 
 from livezen.api import api_router
-from livezen.config import TORTOISE_ORM
+from livezen.catalog import catalog
+from livezen.conditional import NotModified
+from livezen.config import METRICS_ENABLED, SQL_STATS_ENABLED, TORTOISE_ORM
+from livezen.core.security import password_hasher
+from livezen.db import ensure_tables
 from livezen.exceptions import BaseAppException
 from livezen.logging import configure_logging
+from livezen.metrics import MetricsMiddleware, loop_lag_monitor, router as metrics_router
+from livezen.models import TableVersion
+from livezen.product.related import related_index
+from livezen.product.search import search_index
+from livezen.querystats import QueryStatsMiddleware, install as install_query_stats, uninstall as uninstall_query_stats
+from livezen.settings.models import Setting
 
 PROJECT_ROOT: str = os.path.abspath(
     os.path.join(os.path.dirname(__file__), os.pardir))
@@ -25,7 +36,29 @@ log = logging.getLogger(__name__)
 # we configure the logging level and format
 configure_logging()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs inside the Tortoise lifespan registered below, so the DB is ready
+    if SQL_STATS_ENABLED:
+        install_query_stats()
+    # Tables added since the last migration: the catalog's ETags read table_version
+    await ensure_tables(TableVersion, Setting)
+    await catalog.reload()
+    await related_index.load()
+    related_index.start()
+    await search_index.setup()
+    if METRICS_ENABLED:
+        loop_lag_monitor.start()
+    yield
+    await loop_lag_monitor.stop()
+    await related_index.stop()
+    uninstall_query_stats()
+    catalog.clear()
+    password_hasher.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Global exception handler
 
@@ -42,6 +75,11 @@ async def app_exception_handler(request, exc):
     )
 
 
+@app.exception_handler(NotModified)
+async def not_modified_handler(request, exc):
+    return Response(status_code=304, headers=exc.headers)
+
+
 # Register middlewares
 app.add_middleware(
     CORSMiddleware,
@@ -50,6 +88,11 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if SQL_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+if METRICS_ENABLED:
+    # Added last, so it runs first and times everything below it
+    app.add_middleware(MetricsMiddleware)
 
 
 register_tortoise(
@@ -61,3 +104,5 @@ register_tortoise(
 
 
 app.include_router(api_router)
+if METRICS_ENABLED:
+    app.include_router(metrics_router)
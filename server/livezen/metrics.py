@@ -0,0 +1,223 @@
+"""
+Request metrics in the Prometheus text exposition format.
+
+`MetricsMiddleware` records, per route template (`/api/products/{slug}`, not
+the raw path) and method, histograms of latency and response size and a count
+per status code, plus a gauge of requests in flight. `LoopLagMonitor` samples
+how late the event loop wakes up a sleeping task. Both write into
+pre-allocated bucket arrays, so recording a request costs a few list
+increments. Everything is served by `GET /metrics`.
+
+Counters are per process: with several workers, scrape each one (or sum them).
+Off unless METRICS_ENABLED; the endpoint is unauthenticated, so keep it
+internal (blocked at the proxy, scraped from inside the network).
+"""
+import asyncio
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from livezen.config import METRICS_LOOP_LAG_INTERVAL
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)  # bytes
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)  # seconds
+
+# Route label of requests no route matched (scans, typos), so they share one series
+UNMATCHED = "unmatched"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Fixed-bucket histogram; `counts[i]` holds observations <= `bounds[i]`, the last slot the rest."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str, lines: List[str]) -> None:
+        prefix = f"{labels}," if labels else ""
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound:g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.sum!r}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+
+
+class RouteMetrics:
+    __slots__ = ("latency", "size", "statuses")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.statuses: Dict[int, int] = {}
+
+    def record(self, status: int, seconds: float, size: int) -> None:
+        self.latency.observe(seconds)
+        self.size.observe(size)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+
+class Metrics:
+    def __init__(self):
+        self.in_flight = 0
+        self.loop_lag = Histogram(LAG_BUCKETS)
+        self.loop_lag_last = 0.0
+        # route template -> method -> metrics; both levels are bounded by the app's routes
+        self._routes: Dict[str, Dict[str, RouteMetrics]] = {}
+
+    def route(self, path: str, method: str) -> RouteMetrics:
+        methods = self._routes.get(path)
+        if methods is None:
+            methods = self._routes[path] = {}
+        metrics = methods.get(method)
+        if metrics is None:
+            metrics = methods[method] = RouteMetrics()
+        return metrics
+
+    def render(self) -> str:
+        routes = [
+            (f'method="{method}",route="{_escape(path)}"', metrics)
+            for path, methods in sorted(self._routes.items()) for method, metrics in sorted(methods.items())
+        ]
+        lines = [
+            "# HELP http_requests_total Requests handled, by route template, method and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for labels, metrics in routes:
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(f'http_requests_total{{{labels},status="{status}"}} {count}')
+        lines += [
+            "# HELP http_request_duration_seconds Time to the last byte of the response.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for labels, metrics in routes:
+            metrics.latency.render("http_request_duration_seconds", labels, lines)
+        lines += [
+            "# HELP http_response_size_bytes Response body size.",
+            "# TYPE http_response_size_bytes histogram",
+        ]
+        for labels, metrics in routes:
+            metrics.size.render("http_response_size_bytes", labels, lines)
+        lines += [
+            "# HELP http_requests_in_flight Requests being handled.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP event_loop_lag_seconds How late the event loop ran a task that was due.",
+            "# TYPE event_loop_lag_seconds histogram",
+        ]
+        self.loop_lag.render("event_loop_lag_seconds", "", lines)
+        lines += [
+            "# HELP event_loop_lag_last_seconds Most recent event loop lag sample.",
+            "# TYPE event_loop_lag_last_seconds gauge",
+            f"event_loop_lag_last_seconds {self.loop_lag_last!r}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streamed responses are timed to their last chunk."""
+
+    def __init__(self, app: ASGIApp, registry: Metrics = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        status = 500  # if the app fails before starting a response
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        registry.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            registry.in_flight -= 1
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            path = getattr(route, "path", None) or UNMATCHED
+            registry.route(path, scope["method"]).record(status, time.perf_counter() - started, size)
+
+
+class LoopLagMonitor:
+    """
+    Usage (in the app lifespan):
+        monitor = LoopLagMonitor(metrics)
+        monitor.start()
+        ...
+        await monitor.stop()
+    """
+
+    def __init__(self, registry: Metrics = metrics, interval: float = METRICS_LOOP_LAG_INTERVAL):
+        self.registry = registry
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            due = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - due)
+            self.registry.loop_lag.observe(lag)
+            self.registry.loop_lag_last = lag
+
+
+loop_lag_monitor = LoopLagMonitor()
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
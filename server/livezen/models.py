@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel
 from tortoise import fields, models
 
@@ -7,9 +8,20 @@ class TimestampMixin:
     updated_at = fields.DatetimeField(auto_now=True, index=True)
 
 
+class TableVersion(models.Model):
+    """Change counter per table, bumped on every write; read endpoints derive their ETags from it."""
+    table = fields.CharField(max_length=64, pk=True)
+    version = fields.BigIntField(default=0)
+    updated_at = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        table = "table_version"
+
+
 class Pagination(BaseModel):
     """Pydantic model for paginated results."""
     itemsPerPage: int
     page: int
     perPage: int
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
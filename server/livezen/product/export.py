@@ -0,0 +1,51 @@
+"""
+Catalog export encoders.
+
+`encode(pages, fmt)` turns the chunks yielded by ProductService.export into
+NDJSON or CSV bytes, one piece per chunk, so the response is written while the
+next chunk is read. CSV uses the importer's columns (relations as '|'-separated
+slugs), so an exported file can be imported again.
+"""
+import csv
+import io
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List
+
+from livezen.enums import ExportFormat
+from livezen.responses import dumps
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+}
+
+CSV_FIELDS = (
+    "id", "name", "slug", "status", "product_type", "price", "sale_price", "sku", "unit",
+    "description", "quantity",
+)
+CSV_COLUMNS = CSV_FIELDS + ("image", "type", "categories", "tags")
+
+
+def _csv_row(product: Dict[str, Any]) -> List[Any]:
+    row = [product[field] for field in CSV_FIELDS]
+    row.append(dumps(product["image"]).decode() if product["image"] is not None else None)
+    row.append(product["type"]["slug"] if product["type"] else None)
+    row.append("|".join(category["slug"] for category in product["categories"]))
+    row.append("|".join(tag["slug"] for tag in product["tags"]))
+    return row
+
+
+async def encode(pages: AsyncIterable[List[Dict[str, Any]]], fmt: ExportFormat) -> AsyncIterator[bytes]:
+    if fmt == ExportFormat.csv:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_COLUMNS)
+        async for page in pages:
+            writer.writerows(_csv_row(product) for product in page)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")  # header of an empty export
+    else:
+        async for page in pages:
+            yield b"".join(dumps(product) + b"\n" for product in page)
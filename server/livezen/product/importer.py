@@ -0,0 +1,271 @@
+"""
+Bulk product import from CSV or JSON Lines.
+
+The file is parsed as a stream and imported IMPORT_BATCH_SIZE rows at a time:
+each batch is validated, its type/category/tag slugs are resolved with one
+query per table (and remembered for later batches), and its products and join
+rows are written with multi-row INSERTs in one transaction. A bad row is
+reported with its line number and skipped; a batch that fails to write is
+reported row by row and the import moves on.
+
+CSV columns are the ProductImportRow fields, with `categories` and `tags` as
+'|'-separated slugs. JSONL rows are ProductImportRow objects.
+
+    python -m livezen.product.importer products.csv [--format jsonl] [--batch-size 1000]
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import sys
+from typing import IO, Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from slugify import slugify
+from tortoise import Tortoise
+from tortoise.exceptions import BaseORMException
+from tortoise.transactions import in_transaction
+
+from livezen.category.models import Category
+from livezen.config import IMPORT_BATCH_SIZE, IMPORT_MAX_ERRORS, TORTOISE_ORM, WRITE_CONNECTION
+from livezen.db import ensure_tables, write_db
+from livezen.models import TableVersion
+from livezen.relations import add_links
+from livezen.tag.models import Tag
+from livezen.type.models import Type
+
+from .models import Product, ProductImportError, ProductImportReport, ProductImportRow
+from .related import related_index
+from .repository import ProductRepository
+from .search import search_index
+
+CSV = "csv"
+JSONL = "jsonl"
+FORMATS = {".csv": CSV, ".jsonl": JSONL, ".ndjson": JSONL}
+
+
+class ImportRecord(NamedTuple):
+    line: int
+    data: Optional[Dict[str, Any]]
+    error: Optional[str] = None
+
+
+def format_for(filename: Optional[str]) -> Optional[str]:
+    """The import format implied by a file name, if any."""
+    return FORMATS.get(os.path.splitext(filename or "")[1].lower())
+
+
+def read_records(file: IO[bytes], fmt: str) -> Iterator[ImportRecord]:
+    """Parse a binary file lazily into import records, one per row."""
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        yield from (_read_csv(text) if fmt == CSV else _read_jsonl(text))
+    finally:
+        text.detach()  # leave the caller's file open
+
+
+def _read_csv(text: IO[str]) -> Iterator[ImportRecord]:
+    reader = csv.DictReader(text)
+    try:
+        for data in reader:
+            # Empty cells are missing values; JSON cells (image) are decoded
+            row: Dict[str, Any] = {}
+            for key, value in data.items():
+                if key is None or value is None or value == "":
+                    continue
+                if value[0] in "{[":
+                    try:
+                        value = json.loads(value)
+                    except ValueError:
+                        pass
+                row[key] = value
+            yield ImportRecord(reader.line_num, row)
+    except (csv.Error, UnicodeDecodeError) as e:
+        yield ImportRecord(reader.line_num + 1, None, f"Unreadable CSV, import stopped: {e}")
+
+
+def _read_jsonl(text: IO[str]) -> Iterator[ImportRecord]:
+    line = 0
+    try:
+        for line, raw in enumerate(text, start=1):
+            if not raw.strip():
+                continue
+            try:
+                data = json.loads(raw)
+            except ValueError as e:
+                yield ImportRecord(line, None, f"Invalid JSON: {e}")
+                continue
+            if not isinstance(data, dict):
+                yield ImportRecord(line, None, "Expected a JSON object")
+                continue
+            yield ImportRecord(line, data)
+    except UnicodeDecodeError as e:
+        yield ImportRecord(line + 1, None, f"Unreadable file, import stopped: {e}")
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors())
+
+
+class ProductImporter:
+    """
+    Usage:
+        report = await ProductImporter(repository).run(read_records(file, CSV))
+    """
+
+    def __init__(
+        self,
+        repository: ProductRepository,
+        batch_size: int = IMPORT_BATCH_SIZE,
+        max_errors: int = IMPORT_MAX_ERRORS,
+    ):
+        self.repository = repository
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+
+    async def run(self, records: Iterable[ImportRecord]) -> ProductImportReport:
+        self._report = ProductImportReport()
+        self._names: Set[str] = set()  # imported so far, to catch duplicates within the file
+        # slug -> id, filled as batches mention new slugs
+        self._types: Dict[str, int] = {}
+        self._type_ids: Set[int] = set()
+        self._categories: Dict[str, int] = {}
+        self._tags: Dict[str, int] = {}
+        for slug, type_id in await Type.all().values_list("slug", "id"):
+            self._types.setdefault(slug, type_id)
+            self._type_ids.add(type_id)
+
+        batch: List[ImportRecord] = []
+        for record in records:
+            self._report.total += 1
+            if record.error:
+                self._fail(record.line, None, record.error)
+                continue
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                await self._import(batch)
+                batch = []
+        if batch:
+            await self._import(batch)
+
+        if self._report.created:
+            await self.repository.touch()
+        self._report.errors.sort(key=lambda error: error.line)
+        return self._report
+
+    def _fail(self, line: int, name: Optional[str], error: str) -> None:
+        self._report.failed += 1
+        if len(self._report.errors) < self.max_errors:
+            self._report.errors.append(ProductImportError(line=line, name=name, error=error))
+        else:
+            self._report.errors_truncated = True
+
+    async def _resolve(self, rows: List[Tuple[int, ProductImportRow]]) -> None:
+        """Look up the batch's unseen category and tag slugs, one query per table."""
+        for model, known, attr in ((Category, self._categories, "categories"), (Tag, self._tags, "tags")):
+            missing = {slug for _, row in rows for slug in getattr(row, attr)} - known.keys()
+            if missing:
+                for slug, related_id in await model.filter(slug__in=list(missing)).values_list("slug", "id"):
+                    known.setdefault(slug, related_id)
+
+    async def _import(self, batch: List[ImportRecord]) -> None:
+        rows: List[Tuple[int, ProductImportRow]] = []
+        for record in batch:
+            try:
+                rows.append((record.line, ProductImportRow.model_validate(record.data)))
+            except ValidationError as e:
+                name = record.data.get("name")
+                self._fail(record.line, name if isinstance(name, str) else None, _validation_message(e))
+        if not rows:
+            return
+        await self._resolve(rows)
+
+        existing = set(await Product.filter(name__in=[row.name for _, row in rows])
+                       .using_db(write_db()).values_list("name", flat=True))
+
+        products: List[Product] = []
+        accepted: List[Tuple[int, ProductImportRow, List[int], List[int]]] = []
+        for line, row in rows:
+            if row.name in existing or row.name in self._names:
+                self._fail(line, row.name, "A product with this name already exists")
+                continue
+            type_id = row.type_id if row.type_id is not None else self._types.get(row.type)
+            if type_id not in self._type_ids:
+                self._fail(line, row.name, f"Unknown type: {row.type if row.type_id is None else row.type_id}")
+                continue
+            unknown = [slug for slug in row.categories if slug not in self._categories] \
+                + [slug for slug in row.tags if slug not in self._tags]
+            if unknown:
+                self._fail(line, row.name, f"Unknown category or tag: {', '.join(unknown)}")
+                continue
+
+            self._names.add(row.name)
+            products.append(Product(
+                **row.model_dump(exclude={"slug", "type", "type_id", "categories", "tags"}),
+                slug=row.slug or slugify(row.name, max_length=20),
+                type_id=type_id,
+            ))
+            accepted.append((
+                line, row,
+                [self._categories[slug] for slug in row.categories],
+                [self._tags[slug] for slug in row.tags],
+            ))
+        if not products:
+            return
+
+        try:
+            async with in_transaction(WRITE_CONNECTION) as db:
+                await Product.bulk_create(products, using_db=db)
+                ids = dict(await Product.filter(name__in=[product.name for product in products])
+                           .using_db(db).values_list("name", "id"))
+                await add_links(Product, "categories", [
+                    (ids[row.name], category_id)
+                    for _, row, category_ids, _ in accepted for category_id in category_ids
+                ], db)
+                await add_links(Product, "tags", [
+                    (ids[row.name], tag_id) for _, row, _, tag_ids in accepted for tag_id in tag_ids
+                ], db)
+        except BaseORMException as e:
+            for line, row, _, _ in accepted:
+                self._names.discard(row.name)
+                self._fail(line, row.name, f"Could not save: {e}")
+            return
+
+        self._report.created += len(accepted)
+        related_index.add_products(
+            (ids[row.name], category_ids, tag_ids) for _, row, category_ids, tag_ids in accepted)
+        await search_index.index_products(ids.values())
+
+
+async def _main(path: str, fmt: Optional[str], batch_size: int) -> ProductImportReport:
+    await Tortoise.init(config=TORTOISE_ORM)
+    try:
+        # Same startup as the app, so the full-text index and table versions are kept in step
+        await ensure_tables(TableVersion)
+        await search_index.setup()
+        with open(path, "rb") as file:
+            return await ProductImporter(ProductRepository(), batch_size=batch_size).run(read_records(file, fmt))
+    finally:
+        await Tortoise.close_connections()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import products from a CSV or JSON Lines file.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=[CSV, JSONL], help="Defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or format_for(args.path)
+    if fmt is None:
+        parser.error("cannot tell the format from the file name, pass --format")
+    report = asyncio.run(_main(args.path, fmt, args.batch_size))
+    print(report.model_dump_json(indent=2))
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 from typing import Any, List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 from tortoise import fields, models
 
 from livezen.category.models import Category, CategoryReadSimple
@@ -12,7 +12,7 @@ from livezen.tag.models import Tag, TagReadSimple
 class Product(models.Model):
     id = fields.BigIntField(pk=True, index=True)
     name = fields.CharField(max_length=20, unique=True)
-    slug = fields.CharField(max_length=20)
+    slug = fields.CharField(max_length=20, index=True)
     status = fields.CharEnumField(ProductStatus, null=True, index=True)
     product_type = fields.CharEnumField(ProductType, null=True, index=True)
     price = fields.FloatField()
@@ -83,7 +83,55 @@ class ProductRead(ProductBase):
     categories: list[CategoryReadSimple]
     tags: list[TagReadSimple]
     related_products: Optional[List[ProductReadSimple]] = []
+    in_wishlist: Optional[bool] = Field(default=None, description="Set on list pages for signed-in users")
+
+
+class ProductExport(ProductBase):
+    id: int
+    type: Optional[TypeRead] = None
+    categories: list[CategoryReadSimple]
+    tags: list[TagReadSimple]
 
 
 class ProductPagination(Pagination):
     data: list[ProductRead]
+
+
+# Bulk import
+class ProductImportRow(ProductBase):
+    """One CSV/JSONL import row: relations are given by slug."""
+    name: str = Field(min_length=1, max_length=20)
+    slug: Optional[str] = Field(default=None, max_length=20)
+    type_id: Optional[int] = None
+    type: Optional[str] = Field(default=None, description="Type slug, used when type_id is empty")
+    categories: list[str] = Field(default=[], description="Category slugs, '|'-separated in CSV")
+    tags: list[str] = Field(default=[], description="Tag slugs, '|'-separated in CSV")
+
+    @field_validator("categories", "tags", mode="before")
+    @classmethod
+    def split_slugs(cls, value: Any) -> Any:
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [slug.strip() for slug in value.split("|") if slug.strip()]
+        return value
+
+    @model_validator(mode="after")
+    def check_type(self) -> "ProductImportRow":
+        if self.type_id is None and not self.type:
+            raise ValueError("type or type_id is required")
+        return self
+
+
+class ProductImportError(BaseModel):
+    line: int
+    name: Optional[str] = None
+    error: str
+
+
+class ProductImportReport(BaseModel):
+    total: int = 0
+    created: int = 0
+    failed: int = 0
+    errors: list[ProductImportError] = []
+    errors_truncated: bool = False
@@ -0,0 +1,229 @@
+"""
+In-process related-products index.
+
+Product -> category/tag memberships are loaded once at startup and kept up to
+date by ProductService, CategoryService and TagService. Related products are
+ranked by how many categories and tags they share with a product, capped at
+RELATED_PRODUCTS_LIMIT, and memoized until a product sharing a category or
+tag with it changes.
+
+Ranking a product in a large category takes milliseconds, so after a load the
+newest RELATED_PRODUCTS_WARM products are ranked by a background task, and a
+memoized ranking that a write drops is queued there again. The task runs on
+the event loop one product at a time, yielding in between: the index is
+mutated on the loop, so ranking in a thread would race with writes (and hold
+the GIL anyway). A product not ranked yet is ranked on its first view.
+"""
+import asyncio
+import heapq
+import logging
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from livezen.config import RELATED_PRODUCTS_LIMIT, RELATED_PRODUCTS_WARM
+
+from .models import Product
+
+log = logging.getLogger(__name__)
+
+# A shared category says more about two products than a shared tag
+CATEGORY_WEIGHT = 2
+TAG_WEIGHT = 1
+
+
+class RelatedProductsIndex:
+    """
+    Usage (in the app lifespan):
+        await related_index.load()
+        related_index.start()
+        ...
+        await related_index.stop()
+    """
+
+    def __init__(self, limit: int = RELATED_PRODUCTS_LIMIT, warm: int = RELATED_PRODUCTS_WARM):
+        self.limit = limit
+        self.warm = warm
+        self.loaded = False
+        self._categories: Dict[int, FrozenSet[int]] = {}  # product id -> category ids
+        self._tags: Dict[int, FrozenSet[int]] = {}  # product id -> tag ids
+        self._by_category: Dict[int, Set[int]] = {}  # category id -> product ids
+        self._by_tag: Dict[int, Set[int]] = {}  # tag id -> product ids
+        self._related: Dict[int, List[int]] = {}  # product id -> ranked related ids
+        # Product ids to rank in the background, a dict as an ordered set popped from the end
+        self._pending: Dict[int, None] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def load(self) -> None:
+        """Build the membership index from the join tables (two queries)."""
+        categories: Dict[int, Set[int]] = {}
+        tags: Dict[int, Set[int]] = {}
+        for product_id, category_id in await Product.all().values_list("id", "categories__id"):
+            ids = categories.setdefault(product_id, set())
+            if category_id is not None:
+                ids.add(category_id)
+        for product_id, tag_id in await Product.all().values_list("id", "tags__id"):
+            ids = tags.setdefault(product_id, set())
+            if tag_id is not None:
+                ids.add(tag_id)
+
+        self._categories, self._tags = {}, {}
+        self._by_category, self._by_tag = {}, {}
+        self._related = {}
+        for product_id in categories.keys() | tags.keys():
+            self._index(product_id, categories.get(product_id, ()), tags.get(product_id, ()))
+        self._pending = {}
+        if self.warm > 0:
+            # Oldest first, so the newest products are popped (ranked) first
+            self._queue(sorted(self._categories)[-self.warm:])
+        self.loaded = True
+        log.debug("Related products index loaded with %s products", len(self._categories))
+
+    def related(self, product_id: int) -> List[int]:
+        """Ids of the products most related to `product_id`, best match first."""
+        cached = self._related.get(product_id)
+        if cached is None:
+            cached = self._related[product_id] = self._rank(product_id)
+        return cached
+
+    def start(self) -> None:
+        """Rank queued products in the background until `stop`."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            while self._pending:
+                product_id, _ = self._pending.popitem()
+                if product_id in self._related or product_id not in self._categories:
+                    continue
+                self._related[product_id] = self._rank(product_id)
+                await asyncio.sleep(0)  # let requests in between products
+
+    def _queue(self, product_ids: Iterable[int]) -> None:
+        for product_id in product_ids:
+            self._pending[product_id] = None
+        if self._pending:
+            self._wake.set()
+
+    def set_product(
+        self,
+        product_id: int,
+        category_ids: Optional[Iterable[int]] = None,
+        tag_ids: Optional[Iterable[int]] = None,
+    ) -> None:
+        """Record a product's memberships. None keeps the current value."""
+        old_categories = self._categories.get(product_id, frozenset())
+        old_tags = self._tags.get(product_id, frozenset())
+        new_categories = old_categories if category_ids is None else frozenset(category_ids)
+        new_tags = old_tags if tag_ids is None else frozenset(tag_ids)
+
+        self._invalidate(product_id, old_categories | new_categories, old_tags | new_tags)
+        self._unindex(product_id)
+        self._index(product_id, new_categories, new_tags)
+
+    def add_products(self, memberships: Iterable[Tuple[int, Iterable[int], Iterable[int]]]) -> None:
+        """
+        Record many new products at once, e.g. after a bulk import.
+
+        `set_product` walks every member of each touched category; here only the
+        memoized rankings are checked, once per call.
+        """
+        categories: Set[int] = set()
+        tags: Set[int] = set()
+        for product_id, category_ids, tag_ids in memberships:
+            self._unindex(product_id)
+            self._index(product_id, category_ids, tag_ids)
+            categories |= self._categories[product_id]
+            tags |= self._tags[product_id]
+        stale = [
+            product_id for product_id in self._related
+            if self._categories.get(product_id, frozenset()) & categories
+            or self._tags.get(product_id, frozenset()) & tags
+        ]
+        for product_id in stale:
+            del self._related[product_id]
+        self._queue(stale)
+
+    def remove_product(self, product_id: int) -> None:
+        self._invalidate(
+            product_id,
+            self._categories.get(product_id, frozenset()),
+            self._tags.get(product_id, frozenset()),
+        )
+        self._unindex(product_id)
+
+    def remove_category(self, category_id: int) -> None:
+        for product_id in list(self._by_category.get(category_id, ())):
+            self.set_product(product_id, category_ids=self._categories[product_id] - {category_id})
+
+    def remove_tag(self, tag_id: int) -> None:
+        for product_id in list(self._by_tag.get(tag_id, ())):
+            self.set_product(product_id, tag_ids=self._tags[product_id] - {tag_id})
+
+    def _rank(self, product_id: int) -> List[int]:
+        # Counter.update counts a whole member set in C; a weight is that many passes
+        scores: Counter = Counter()
+        for category_id in self._categories.get(product_id, ()):
+            members = self._by_category.get(category_id, ())
+            for _ in range(CATEGORY_WEIGHT):
+                scores.update(members)
+        for tag_id in self._tags.get(product_id, ()):
+            members = self._by_tag.get(tag_id, ())
+            for _ in range(TAG_WEIGHT):
+                scores.update(members)
+        scores.pop(product_id, None)
+        # Highest overlap first, newer products first on ties; scores are few distinct
+        # small numbers, so only the ids of the best ones are compared
+        best: List[int] = []
+        for score in sorted(set(scores.values()), reverse=True):
+            ids = [other for other, value in scores.items() if value == score]
+            best += heapq.nlargest(self.limit - len(best), ids)
+            if len(best) >= self.limit:
+                break
+        return best
+
+    def _invalidate(self, product_id: int, category_ids: Iterable[int], tag_ids: Iterable[int]) -> None:
+        stale = [product_id]
+        for category_id in category_ids:
+            stale.extend(self._by_category.get(category_id, ()))
+        for tag_id in tag_ids:
+            stale.extend(self._by_tag.get(tag_id, ()))
+        # Memoized rankings are recomputed in the background rather than on the next view
+        self._queue([other for other in stale if self._related.pop(other, None) is not None])
+
+    def _index(self, product_id: int, category_ids: Iterable[int], tag_ids: Iterable[int]) -> None:
+        self._categories[product_id] = frozenset(category_ids)
+        self._tags[product_id] = frozenset(tag_ids)
+        for category_id in self._categories[product_id]:
+            self._by_category.setdefault(category_id, set()).add(product_id)
+        for tag_id in self._tags[product_id]:
+            self._by_tag.setdefault(tag_id, set()).add(product_id)
+
+    def _unindex(self, product_id: int) -> None:
+        for category_id in self._categories.pop(product_id, ()):
+            members = self._by_category.get(category_id)
+            if members is not None:
+                members.discard(product_id)
+                if not members:
+                    del self._by_category[category_id]
+        for tag_id in self._tags.pop(product_id, ()):
+            members = self._by_tag.get(tag_id)
+            if members is not None:
+                members.discard(product_id)
+                if not members:
+                    del self._by_tag[tag_id]
+
+
+related_index = RelatedProductsIndex()
@@ -4,5 +4,7 @@ from .models import Product
 
 
 class ProductRepository(BaseRepository[Product]):
+    versioned = True
+
     def __init__(self):
         super().__init__(Product)
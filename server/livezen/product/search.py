@@ -0,0 +1,188 @@
+"""
+Full-text product search backed by an SQLite FTS5 table.
+
+`product_fts` holds one row per product (rowid = product id) with its name,
+description, slug and the names of its tags and categories. ProductService
+keeps it in sync on create/update/delete, and results are ranked with BM25.
+
+On databases without FTS5 the index stays unavailable and callers fall back
+to `icontains` filters.
+"""
+import logging
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.exceptions import OperationalError
+from tortoise.expressions import Q, RawSQL
+
+from livezen.db import read_db
+from livezen.search import TextTerm
+
+from .models import Product
+
+log = logging.getLogger(__name__)
+
+FTS_TABLE = "product_fts"
+FTS_COLUMNS = ("name", "description", "slug", "tags", "categories")
+# bm25() weights, in FTS_COLUMNS order: a hit in the name matters most
+FTS_WEIGHTS = (10.0, 1.0, 5.0, 3.0, 3.0)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def match_expression(terms: Sequence[TextTerm]) -> Optional[str]:
+    """
+    Turn free user text into a safe FTS5 query: every word, as a prefix, must
+    match, in the term's columns (`name : "apple"*`) or in any column.
+    """
+    words = []
+    for columns, value in terms:
+        scope = "" if not columns else f"{columns[0]} : " if len(columns) == 1 else f"{{{' '.join(columns)}}} : "
+        words += [f'{scope}"{token}"*' for token in _TOKEN_RE.findall(value)]
+    return " ".join(words) or None
+
+
+class ProductSearchIndex:
+    def __init__(self):
+        self.available = False
+
+    @property
+    def db(self):
+        return Product._meta.db
+
+    async def setup(self) -> None:
+        """Create the FTS table if needed and rebuild it when it is out of step with `product`."""
+        if self.db.capabilities.dialect != "sqlite":
+            log.info("Full-text search disabled: %s has no FTS5", self.db.capabilities.dialect)
+            return
+        try:
+            await self.db.execute_script(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"{', '.join(FTS_COLUMNS)}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+        except OperationalError as e:
+            log.warning("Full-text search disabled: %s", e)
+            return
+        self.available = True
+
+        _, rows = await self.db.execute_query(f"SELECT COUNT(*) FROM {FTS_TABLE}")
+        if rows[0][0] != await Product.all().count():
+            await self.rebuild()
+
+    async def rebuild(self) -> None:
+        await self.db.execute_script(f"DELETE FROM {FTS_TABLE}")
+        await self._write(await self._documents())
+        log.info("Full-text product index rebuilt")
+
+    async def index_products(self, product_ids: Iterable[int]) -> None:
+        product_ids = list(product_ids)
+        if not self.available:
+            return
+        # Keep IN (...) lists well under SQLite's bound-parameter limit
+        for start in range(0, len(product_ids), 500):
+            chunk = product_ids[start:start + 500]
+            await self._delete(chunk)
+            await self._write(await self._documents(chunk))
+
+    async def index_product(self, product_id: int) -> None:
+        await self.index_products([product_id])
+
+    async def remove_product(self, product_id: int) -> None:
+        if self.available:
+            await self._delete([product_id])
+
+    async def reindex_category(self, category_id: int) -> None:
+        """Refresh products whose category names changed."""
+        if self.available:
+            await self.index_products(
+                await Product.filter(categories__id=category_id).values_list("id", flat=True))
+
+    async def reindex_tag(self, tag_id: int) -> None:
+        """Refresh products whose tag names changed."""
+        if self.available:
+            await self.index_products(
+                await Product.filter(tags__id=tag_id).values_list("id", flat=True))
+
+    async def search(
+        self, terms: Sequence[TextTerm], search: Q = Q(), offset: int = 0, limit: Optional[int] = None
+    ) -> List[int]:
+        """Ids of products matching `terms` and the `search` filters, best BM25 score first."""
+        db = read_db()
+        where = self._where(terms, search, db)
+        if where is None:
+            return []
+        sql, params = where
+        weights = ", ".join(map(str, FTS_WEIGHTS))
+        _, rows = await db.execute_query(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {sql} "
+            f"ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT ? OFFSET ?",
+            [*params, -1 if limit is None else limit, offset],
+        )
+        return [row[0] for row in rows]
+
+    async def count(self, terms: Sequence[TextTerm], search: Q = Q()) -> int:
+        """Number of products matching `terms` and the `search` filters."""
+        db = read_db()
+        where = self._where(terms, search, db)
+        if where is None:
+            return 0
+        sql, params = where
+        _, rows = await db.execute_query(f"SELECT COUNT(*) FROM {FTS_TABLE} WHERE {sql}", params)
+        return rows[0][0]
+
+    def condition(self, terms: Sequence[TextTerm]) -> Q:
+        """`id IN (full-text matches)`, to combine the index with ORM queries."""
+        expression = match_expression(terms)
+        if not self.available or expression is None:
+            return Q(id__in=[])
+        # RawSQL takes no parameters; the expression only holds quoted \w tokens and column names
+        literal = expression.replace("'", "''")
+        return Q(id__in=RawSQL(f"(SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH '{literal}')"))
+
+    def _where(
+        self, terms: Sequence[TextTerm], search: Q, db: BaseDBAsyncClient
+    ) -> Optional[Tuple[str, list]]:
+        """The MATCH condition, narrowed to products passing `search` in the same statement."""
+        expression = match_expression(terms)
+        if not self.available or expression is None:
+            return None
+        if not (search.filters or search.children):
+            return f"{FTS_TABLE} MATCH ?", [expression]
+        query = Product.filter(search).using_db(db).values_list("id", flat=True)
+        query.sql()  # builds query.query
+        filtered, params = query.query.get_parameterized_sql()
+        # `+rowid` keeps SQLite from handing the IN list to FTS5, which would re-run the MATCH per id
+        return f"{FTS_TABLE} MATCH ? AND +rowid IN ({filtered})", [expression, *params]
+
+    async def _documents(self, product_ids: Optional[List[int]] = None) -> List[list]:
+        query = Product.filter(id__in=product_ids) if product_ids is not None else Product.all()
+        documents: Dict[int, list] = {
+            row["id"]: [row["id"], row["name"], row["description"] or "", row["slug"], [], []]
+            for row in await query.values("id", "name", "description", "slug")
+        }
+        for product_id, tag_name in await query.values_list("id", "tags__name"):
+            if tag_name:
+                documents[product_id][4].append(tag_name)
+        for product_id, category_name in await query.values_list("id", "categories__name"):
+            if category_name:
+                documents[product_id][5].append(category_name)
+        return [
+            [product_id, name, description, slug, " ".join(tags), " ".join(categories)]
+            for product_id, name, description, slug, tags, categories in documents.values()
+        ]
+
+    async def _write(self, documents: List[list]) -> None:
+        if documents:
+            await self.db.execute_many(
+                f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)",
+                documents,
+            )
+
+    async def _delete(self, product_ids: List[int]) -> None:
+        placeholders = ", ".join("?" for _ in product_ids)
+        await self.db.execute_query(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", product_ids)
+
+
+search_index = ProductSearchIndex()
@@ -1,12 +1,21 @@
-from typing import List, Tuple
+from typing import AsyncIterator, List, Optional, Sequence, Tuple, Type
+from pydantic import BaseModel
 from tortoise.expressions import Q
+from tortoise.models import Model
+from tortoise.transactions import in_transaction
 
 from livezen.auth.utils import CurrentUser
 from livezen.category.models import Category
+from livezen.config import EXPORT_CHUNK_SIZE, WRITE_CONNECTION
+from livezen.enums import TotalMode
+from livezen.relations import sync_links
+from livezen.search import TextTerm
 from livezen.tag.models import Tag
 
-from .models import Product, ProductCreate, ProductUpdate
+from .models import Product, ProductCreate, ProductExport, ProductUpdate
+from .related import related_index
 from .repository import ProductRepository
+from .search import search_index
 
 
 class ProductService:
@@ -14,9 +23,50 @@ class ProductService:
         self.repository = repository
 
     async def paginated(
-        self, page: int, page_size: int, search: Q = Q(), order: list = []
-    ) -> Tuple[int, List[Product]]:
-        return await self.repository.paginated(page, page_size, search, order, prefetch=['type', 'categories', 'tags'])
+        self, page: int, page_size: int, search: Q = Q(), order: list = [], total: TotalMode = TotalMode.exact,
+        text: Sequence[TextTerm] = (), projection: Optional[Type[BaseModel]] = None
+    ) -> Tuple[Optional[int], List[Product]]:
+        if text:
+            return await self._text_paginated(text, page, page_size, search, total, projection)
+        return await self.repository.paginated(
+            page, page_size, search, order, prefetch=['type', 'categories', 'tags'], total_mode=total,
+            projection=projection)
+
+    async def cursor_paginated(
+        self, page_size: int, after: Optional[str] = None, search: Q = Q(), order: list = [],
+        text: Sequence[TextTerm] = (), projection: Optional[Type[BaseModel]] = None
+    ) -> Tuple[List[Product], Optional[str]]:
+        if text:
+            # Cursor pages walk the matches in key order, not by rank
+            search = Q(search, search_index.condition(text))
+        return await self.repository.keyset_paginated(
+            page_size, after, search, order, prefetch=['type', 'categories', 'tags'], projection=projection)
+
+    async def _text_paginated(
+        self, text: Sequence[TextTerm], page: int, page_size: int, search: Q, total: TotalMode = TotalMode.exact,
+        projection: Optional[Type[BaseModel]] = None
+    ) -> Tuple[Optional[int], List[Product]]:
+        """Full-text matches narrowed by the remaining filters, ranked by BM25 and paged in SQL."""
+        page_ids = await search_index.search(text, search, offset=(page - 1) * page_size, limit=page_size)
+        count = None if total == TotalMode.none else await search_index.count(text, search)
+        products = {
+            product["id"] if projection else product.id: product
+            for product in await self.repository.filter(
+                id__in=page_ids, prefetch=['type', 'categories', 'tags'], projection=projection)
+        }
+        return count, [products[product_id] for product_id in page_ids if product_id in products]
+
+    async def export(self, search: Q = Q(), chunk_size: int = EXPORT_CHUNK_SIZE) -> AsyncIterator[List[dict]]:
+        """
+        Every product matching `search` as ProductExport-shaped dicts, `chunk_size`
+        at a time, walking the table by id so memory stays at one chunk.
+        """
+        after: Optional[str] = ""
+        while after is not None:
+            rows, after = await self.repository.keyset_paginated(
+                chunk_size, after, search, projection=ProductExport)
+            if rows:
+                yield rows
 
     async def list_products(self) -> list[Product]:
         return await self.repository.list()
@@ -39,62 +89,79 @@ class ProductService:
         if not product:
             return None
 
-        # Get category IDs of the current product
-        category_ids = [cat.id for cat in await product.categories.all()]
-
-        # Fetch related products: same categories, exclude itself
-        related_products_qs = self.repository.filter(
-            Q(categories__in=category_ids) & ~Q(id=product.id),
-            prefetch=['type', 'categories']
-        )
-
-        related_products: List[Product] = await related_products_qs
-
         # Attach related products dynamically
-        product.related_products = related_products  # type: ignore
+        product.related_products = await self.get_related(product)  # type: ignore
 
         return product
 
-    async def create(self, product_in: ProductCreate) -> Product:
-        # Create product
-        product = await self.repository.create(**product_in.model_dump(exclude={"categories", "tags"}))
-
-        # Attach categories if provided
-        if product_in.categories:
-            categories = await Category.filter(id__in=product_in.categories)
-            await product.categories.add(*categories)
-
-        # Attach tags if provided
-        if product_in.tags:
-            tags = await Tag.filter(id__in=product_in.tags)
-            await product.tags.add(*tags)
+    async def get_related(self, product: Product) -> List[Product]:
+        """Products sharing the most categories/tags with `product`, best match first."""
+        if related_index.loaded:
+            related_ids = related_index.related(product.id)
+        else:
+            # Index not built (e.g. outside the app lifespan): same categories, exclude itself
+            category_ids = [category.id for category in product.categories]
+            related_ids = await Product.filter(
+                Q(categories__id__in=category_ids) & ~Q(id=product.id)
+            ).distinct().order_by("-id").limit(related_index.limit).values_list("id", flat=True)
+        if not related_ids:
+            return []
+        products = {p.id: p for p in await self.repository.filter(id__in=related_ids)}
+        return [products[product_id] for product_id in related_ids if product_id in products]
 
+    async def create(self, product_in: ProductCreate) -> Product:
+        async with in_transaction(WRITE_CONNECTION) as db:
+            # Create product
+            product = await self.repository.create(**product_in.model_dump(exclude={"categories", "tags"}))
+
+            # Attach categories and tags if provided (a new product has none yet)
+            category_ids = await self._existing(Category, product_in.categories)
+            tag_ids = await self._existing(Tag, product_in.tags)
+            await sync_links(Product, "categories", product.id, category_ids, db, current=[])
+            await sync_links(Product, "tags", product.id, tag_ids, db, current=[])
+
+        related_index.set_product(product.id, category_ids, tag_ids)
+        await search_index.index_product(product.id)
         return product
 
     async def update(self, product: Product, product_in: ProductUpdate) -> Product:
         """Updates a product including categories and tags."""
-
-        # 1️⃣ Update normal fields
-        update_data = product_in.model_dump(
-            exclude_unset=True, exclude={"categories", "tags"})
-        product = await self.repository.update(product, **update_data)
-
-        # 2️⃣ Update categories if provided
-        if product_in.categories is not None:
-            # Fetch the category instances
-            categories = await Category.filter(id__in=product_in.categories)
-            # Replace existing categories with new ones
-            await product.categories.clear()
-            await product.categories.add(*categories)
-
-        # 3️⃣ Update tags if provided
-        if product_in.tags is not None:
-            tags = await Tag.filter(id__in=product_in.tags)
-            await product.tags.clear()
-            await product.tags.add(*tags)
-
+        async with in_transaction(WRITE_CONNECTION) as db:
+            # 1️⃣ Sync categories and tags if provided: only rows that differ are written
+            changed = False
+            category_ids = None
+            if product_in.categories is not None:
+                category_ids = await self._existing(Category, product_in.categories)
+                changed |= any(await sync_links(Product, "categories", product.id, category_ids, db))
+
+            tag_ids = None
+            if product_in.tags is not None:
+                tag_ids = await self._existing(Tag, product_in.tags)
+                changed |= any(await sync_links(Product, "tags", product.id, tag_ids, db))
+
+            # 2️⃣ Update normal fields; a save that changes nothing is skipped, so it
+            # leaves updated_at, the table version and cached totals alone
+            update_data = product_in.model_dump(
+                exclude_unset=True, exclude={"categories", "tags"})
+            changed |= any(getattr(product, key) != value for key, value in update_data.items())
+            if changed:
+                product = await self.repository.update(product, **update_data)
+
+        related_index.set_product(product.id, category_ids, tag_ids)
+        await search_index.index_product(product.id)
         return product
 
+    @staticmethod
+    async def _existing(model: Type[Model], ids: Optional[List[int]]) -> List[int]:
+        """The ids in `ids` that exist in `model`'s table; unknown ids are ignored."""
+        if not ids:
+            return []
+        return await model.filter(id__in=ids).values_list("id", flat=True)
+
     async def delete(self, product_id: int) -> bool:
         """Deletes a product."""
-        return await self.repository.delete(product_id)
+        deleted = await self.repository.delete(product_id)
+        if deleted:
+            related_index.remove_product(product_id)
+            await search_index.remove_product(product_id)
+        return deleted
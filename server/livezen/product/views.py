@@ -1,13 +1,28 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, Query
-from tortoise.expressions import Q
+from fastapi import APIRouter, Depends, File, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
 
 from livezen.auth.permissions import AdminPermission, PermissionsDependency
-from livezen.auth.utils import CurrentUser
-from livezen.exceptions import ConflictException, ResourceNotFoundException
-
-from .models import ProductCreate, ProductPagination, ProductRead, ProductReadSimple, ProductUpdate
+from livezen.auth.utils import CurrentUser, OptionalUser, get_optional_user
+from livezen.category.models import Category
+from livezen.conditional import Conditional
+from livezen.config import JSON_STREAM_THRESHOLD
+from livezen.enums import ExportFormat, TotalMode
+from livezen.exceptions import ConflictException, ResourceNotFoundException, ValidationException
+from livezen.querystats import QueryBudget
+from livezen.responses import FastJSONResponse, StreamingJSONResponse, gzip_stream
+from livezen.search import EXACT, SearchField, SearchSpec
+from livezen.tag.models import Tag
+from livezen.type.models import Type
+from livezen.wishlist.membership import wishlist_membership
+
+from .export import MEDIA_TYPES, encode
+from .importer import CSV, JSONL, ProductImporter, format_for, read_records
+from .models import (
+    Product, ProductCreate, ProductImportReport, ProductPagination, ProductRead, ProductReadSimple, ProductUpdate,
+)
 from .repository import ProductRepository
+from .search import search_index
 from .service import ProductService
 
 
@@ -15,48 +30,106 @@ router = APIRouter()
 service = ProductService(ProductRepository())
 
 
-@router.get("", response_model=ProductPagination)
+async def _wishlist_state(request: Request) -> Optional[str]:
+    user = await get_optional_user(request)
+    return None if user is None else await wishlist_membership.fingerprint(user.id)
+
+
+# Product payloads embed their type, categories and tags; list pages also carry
+# the signed-in user's `in_wishlist` flags
+conditional = Conditional(Product, Category, Tag, Type)
+list_conditional = Conditional(Product, Category, Tag, Type, personalize=_wishlist_state)
+
+# Search keys clients may use, and how each is matched
+SEARCH_FIELDS = SearchSpec(Product, {
+    "name": SearchField("name", full_text=True),
+    "text": SearchField("name", "description", full_text=True, text_columns=()),
+    "description": SearchField("description"),
+    "slug": SearchField("slug", lookup=EXACT),
+    "sku": SearchField("sku", lookup=EXACT),
+    "status": SearchField("status", lookup=EXACT),
+    "product_type": SearchField("product_type", lookup=EXACT),
+    "type.slug": SearchField("type__slug", lookup=EXACT),
+    "categories.slug": SearchField("categories__slug", lookup=EXACT),
+    "tags.slug": SearchField("tags__slug", lookup=EXACT),
+})
+
+
+def _page_response(response: Response, data: list, **envelope) -> Response:
+    """A ProductPagination body from projected rows; long pages are streamed in chunks."""
+    if len(data) >= JSON_STREAM_THRESHOLD:
+        return StreamingJSONResponse(data, envelope=envelope, headers=response.headers)
+    return FastJSONResponse({**envelope, "data": data}, headers=response.headers)
+
+
+async def _mark_wishlisted(data: list, user) -> None:
+    """Set `in_wishlist` on projected rows from the user's cached wishlist ids (no query once cached)."""
+    if user is None:
+        return
+    wishlisted = await wishlist_membership.contains_many(user.id, [product["id"] for product in data])
+    for product in data:
+        product["in_wishlist"] = product["id"] in wishlisted
+
+
+@router.get("", response_model=ProductPagination, dependencies=[Depends(list_conditional)])
 async def paginated_products(
+    response: Response,
+    current_user: OptionalUser,
     page: int = Query(1, description="Page Number"),
     page_size: int = Query(10, description="Items Per Page"),
     search: Optional[str] = Query("", description="Product Name for Search"),
     searchJoin: str = Query(
         "and", description="'and' or 'or' join for multiple search conditions"),
+    after: Optional[str] = Query(
+        None, description="Cursor from the previous page's next_cursor; pass an empty value to start cursor pagination"),
+    total: TotalMode = Query(
+        TotalMode.exact, description="'exact', 'estimate' (the last counted total, may be stale) or 'none' (skip counting)"),
 ):
-    q = Q()
-    if search:
-        # Example: search="name:english;status:active"
-        filters = search.split(";")
-        for f in filters:
-            try:
-                field, value = f.split(":", 1)
-
-                # ✅ Support nested related lookups like 'type.slug'
-                field_path = field.replace(".", "__")
-
-                # Build lookup dynamically
-                lookup = {f"{field_path}__icontains": value}
-                condition = Q(**lookup)
-
-                if searchJoin.lower() == "or":
-                    q |= condition
-                else:
-                    q &= condition
-
-            except ValueError:
-                continue  # skip invalid filter format
-
-    total, data = await service.paginated(page=page, page_size=page_size, search=q)
-    return ProductPagination(
-        data=data,
-        itemsPerPage=10,
-        page=page,
-        perPage=page_size,
-        total=total,
-    )
-
-
-@router.get("/{slug}", response_model=ProductRead)
+    # Example: search="name:apple;type.slug:grocery;status:publish"
+    # 🔎 Free-text terms go to the full-text index when it is available (AND joins only)
+    q, text = SEARCH_FIELDS.compile(search, searchJoin, full_text=search_index.available)
+
+    # ⚡ Rows are read straight into ProductRead-shaped dicts and returned without
+    # re-validation (see livezen.projection); `response` carries the cache headers
+    if after is not None:
+        # Keyset mode: no COUNT and no OFFSET, page cost stays flat
+        data, next_cursor = await service.cursor_paginated(
+            page_size=page_size, after=after, search=q, text=text, projection=ProductRead)
+        await _mark_wishlisted(data, current_user)
+        return _page_response(
+            response, data, itemsPerPage=10, page=page, perPage=page_size, total=None, next_cursor=next_cursor)
+
+    total_count, data = await service.paginated(
+        page=page, page_size=page_size, search=q, total=total, text=text, projection=ProductRead)
+    await _mark_wishlisted(data, current_user)
+    return _page_response(
+        response, data, itemsPerPage=10, page=page, perPage=page_size, total=total_count, next_cursor=None)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    # Bulk work: one statement shape per chunk or batch, by design
+    dependencies=[Depends(PermissionsDependency([AdminPermission])), Depends(QueryBudget(queries=0, repeats=0))]
+)
+async def export_products(
+    format: ExportFormat = Query(ExportFormat.ndjson, description="'ndjson' or 'csv'"),
+    gzip: bool = Query(False, description="Compress the file with gzip"),
+    search: Optional[str] = Query("", description="Same filters as the product list"),
+    searchJoin: str = Query(
+        "and", description="'and' or 'or' join for multiple search conditions"),
+):
+    """Stream the whole catalog, read in keyset chunks; memory stays flat however many products there are."""
+    body = encode(service.export(SEARCH_FIELDS.compile(search, searchJoin).q), format)
+    filename = f"products.{format.value}"
+    media_type = MEDIA_TYPES[format]
+    if gzip:
+        body, filename, media_type = gzip_stream(body), f"{filename}.gz", "application/gzip"
+    return StreamingResponse(
+        body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+@router.get("/{slug}", response_model=ProductRead, dependencies=[Depends(conditional)])
 async def get_product(slug: str):
     """Get a product by its id."""
     product = await service.get_by_slug(slug)
@@ -76,6 +149,24 @@ async def create_product(product_in: ProductCreate):
     return await service.create(product_in)
 
 
+@router.post(
+    "/import",
+    response_model=ProductImportReport,
+    # Bulk work: one statement shape per chunk or batch, by design
+    dependencies=[Depends(PermissionsDependency([AdminPermission])), Depends(QueryBudget(queries=0, repeats=0))]
+)
+async def import_products(
+    file: UploadFile = File(..., description="CSV or JSON Lines, one product per row"),
+    format: Optional[str] = Query(
+        None, description="'csv' or 'jsonl'; defaults to the file extension"),
+):
+    """Create products in bulk. Invalid rows are skipped and listed in the report."""
+    fmt = format or format_for(file.filename)
+    if fmt not in (CSV, JSONL):
+        raise ValidationException("Upload a .csv or .jsonl file, or pass format=csv|jsonl")
+    return await ProductImporter(service.repository).run(read_records(file.file, fmt))
+
+
 @router.put("/{product_id}", response_model=ProductReadSimple)
 async def update_product(
     product_id: int,
@@ -0,0 +1,218 @@
+"""
+Per-request SQL instrumentation.
+
+`install()` wraps the execute methods of Tortoise's database clients, so every
+statement, whether it comes from a QuerySet, a raw query or a bulk insert, is
+counted and timed into the `QueryStats` of the current request; `uninstall()`
+puts the original methods back. Off by default (SQL_STATS_ENABLED).
+`QueryStatsMiddleware` opens one per request, and then:
+
+- adds `Server-Timing: db;dur=<ms>;desc="<n> queries"` when SQL_SERVER_TIMING is on
+- warns when a request runs more than SQL_QUERY_BUDGET statements, or the same
+  statement shape (SQL with literals and IN lists folded) more than
+  SQL_REPEAT_LIMIT times, which is what an N+1 loop looks like
+- raises QueryBudgetExceeded at the offending statement instead when SQL_STRICT is on
+
+Routes that legitimately run many statements raise their own limits:
+
+    @router.get("/export", dependencies=[Depends(QueryBudget(queries=0, repeats=0))])
+"""
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache, wraps
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+from livezen.config import SQL_QUERY_BUDGET, SQL_REPEAT_LIMIT, SQL_SERVER_TIMING, SQL_STRICT
+from livezen.exceptions import QueryBudgetExceeded
+
+log = logging.getLogger(__name__)
+
+_METHODS = ("execute_insert", "execute_query", "execute_query_dict", "execute_many", "execute_script")
+
+# (client class, method name) -> the method install() replaced
+_originals: Dict[Tuple[type, str], Callable] = {}
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+# Set while an instrumented call runs, so a client method calling another one counts once
+_inside: ContextVar[bool] = ContextVar("query_stats_inside", default=False)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"\?|\$\d+|%s")
+_LIST = re.compile(r"\(\?(?:\s*,\s*\?)*\)")
+_VALUES = re.compile(r"(\(\?\))(?:\s*,\s*\(\?\))+")
+_SPACE = re.compile(r"\s+")
+
+# Longer statements (multi-row INSERTs) are normalized but not cached
+_CACHED_LENGTH = 2048
+
+
+@lru_cache(maxsize=4096)
+def _normalize(sql: str) -> str:
+    sql = _SPACE.sub(" ", sql).strip()
+    sql = _PARAM.sub("?", _STRING.sub("?", sql))
+    sql = _LIST.sub("(?)", _NUMBER.sub("?", sql))
+    return _VALUES.sub(r"\1", sql)
+
+
+def normalize(sql: str) -> str:
+    """The statement's shape: literals and parameters become `?`, lists of them one `(?)`."""
+    return _normalize(sql) if len(sql) <= _CACHED_LENGTH else _normalize.__wrapped__(sql)
+
+
+class QueryStats:
+    __slots__ = ("count", "seconds", "shapes", "budget", "repeat_limit")
+
+    def __init__(self, budget: int = SQL_QUERY_BUDGET, repeat_limit: int = SQL_REPEAT_LIMIT):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Dict[str, int] = {}
+        self.budget = budget  # 0 = unlimited
+        self.repeat_limit = repeat_limit  # 0 = unlimited
+
+    def check(self, shape: str) -> None:
+        """Raise if running `shape` now would break the budget or the repeat limit."""
+        if self.budget and self.count >= self.budget:
+            raise QueryBudgetExceeded(f"More than {self.budget} SQL queries in one request")
+        if self.repeat_limit and self.shapes.get(shape, 0) >= self.repeat_limit:
+            raise QueryBudgetExceeded(
+                f"Same SQL statement more than {self.repeat_limit} times in one request: {shape[:300]}")
+
+    def record(self, shape: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def over_budget(self) -> bool:
+        return bool(self.budget) and self.count > self.budget
+
+    def repeated(self) -> List[Tuple[str, int]]:
+        """Shapes run more than `repeat_limit` times, most repeated first."""
+        if not self.repeat_limit:
+            return []
+        return sorted(
+            ((shape, count) for shape, count in self.shapes.items() if count > self.repeat_limit),
+            key=lambda item: -item[1],
+        )
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"'
+
+
+def current() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def track(**limits) -> Iterator[QueryStats]:
+    """Count the statements run in this block (and in tasks it starts)."""
+    stats = QueryStats(**limits)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _instrument(method):
+    @wraps(method)
+    async def wrapper(self, query, *args, **kwargs):
+        stats = _current.get()
+        if stats is None or _inside.get():
+            return await method(self, query, *args, **kwargs)
+        shape = normalize(query)
+        if SQL_STRICT:
+            stats.check(shape)
+        token = _inside.set(True)
+        started = time.perf_counter()
+        try:
+            return await method(self, query, *args, **kwargs)
+        finally:
+            _inside.reset(token)
+            stats.record(shape, time.perf_counter() - started)
+
+    return wrapper
+
+
+def install() -> None:
+    """
+    Instrument the loaded Tortoise client classes; call after Tortoise.init.
+    Calling it again only wraps client classes loaded since.
+    """
+    pending = list(BaseDBAsyncClient.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        for name in _METHODS:
+            method = cls.__dict__.get(name)
+            if method is not None and (cls, name) not in _originals:
+                _originals[cls, name] = method
+                setattr(cls, name, _instrument(method))
+
+
+def uninstall() -> None:
+    """Restore the methods `install()` wrapped."""
+    for (cls, name), method in _originals.items():
+        setattr(cls, name, method)
+    _originals.clear()
+
+
+class QueryBudget:
+    """
+    Route dependency overriding the request's limits (0 = unlimited).
+
+        @router.post("/import", dependencies=[Depends(QueryBudget(queries=0, repeats=0))])
+    """
+
+    def __init__(self, queries: int = SQL_QUERY_BUDGET, repeats: int = SQL_REPEAT_LIMIT):
+        self.queries = queries
+        self.repeats = repeats
+
+    async def __call__(self) -> None:
+        stats = _current.get()
+        if stats is not None:
+            stats.budget = self.queries
+            stats.repeat_limit = self.repeats
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app: ASGIApp, server_timing: bool = SQL_SERVER_TIMING):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track() as stats:
+            async def send_wrapper(message: Message) -> None:
+                # Statements run while a response streams are not in its header
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper if self.server_timing else send)
+            finally:
+                _report(scope, stats)
+
+
+def _report(scope: Scope, stats: QueryStats) -> None:
+    over_budget, repeated = stats.over_budget(), stats.repeated()
+    if not over_budget and not repeated:
+        return
+    path = getattr(scope.get("route"), "path", None) or scope["path"]
+    log.warning(
+        "%s %s ran %d SQL queries in %.1f ms%s%s",
+        scope["method"], path, stats.count, stats.seconds * 1000,
+        f" (budget {stats.budget})" if over_budget else "",
+        "".join(f"\n  {count}x {shape[:300]}" for shape, count in repeated[:3]),
+    )
@@ -0,0 +1,83 @@
+"""
+Set-based helpers for many-to-many join tables.
+
+Tortoise's `relation.add()` works one owner at a time (a SELECT and an INSERT
+per call), and replacing a relation with `clear()` + `add()` rewrites every
+join row even when nothing changed. `add_links` writes many (owner, related)
+pairs in a few multi-row statements; `sync_links` only touches the rows that
+differ. Both drop the cached totals of filters reading the join table.
+"""
+from typing import Iterable, List, Optional, Set, Tuple, Type
+
+from pypika_tortoise import Table
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.models import Model
+
+from livezen.repository import BaseRepository
+
+# (owner pk, related pk) pairs per INSERT, two bound parameters each: stays
+# under SQLite's 999-parameter limit on older builds
+LINK_BATCH_SIZE = 400
+
+
+async def add_links(
+    model: Type[Model],
+    relation: str,
+    pairs: Iterable[Tuple[int, int]],
+    using_db: BaseDBAsyncClient,
+) -> int:
+    """
+    Insert `(owner id, related id)` rows into the join table of `model.relation`.
+
+    Pairs must not exist yet (e.g. owners created in the same transaction).
+    Returns the number of rows inserted.
+    """
+    field = model._meta.fields_map[relation]
+    through = Table(field.through)
+    backward, forward = through[field.backward_key], through[field.forward_key]
+    pairs: List[Tuple[int, int]] = list(dict.fromkeys(pairs))
+    for start in range(0, len(pairs), LINK_BATCH_SIZE):
+        query = using_db.query_class.into(through).columns(backward, forward)
+        for owner_id, related_id in pairs[start:start + LINK_BATCH_SIZE]:
+            query = query.insert(owner_id, related_id)
+        await using_db.execute_query(*query.get_parameterized_sql())
+    if pairs:
+        BaseRepository.invalidate_tables(field.through)
+    return len(pairs)
+
+
+async def sync_links(
+    model: Type[Model],
+    relation: str,
+    owner_id: int,
+    related_ids: Iterable[int],
+    using_db: BaseDBAsyncClient,
+    current: Optional[Iterable[int]] = None,
+) -> Tuple[Set[int], Set[int]]:
+    """
+    Make `owner_id`'s `model.relation` exactly `related_ids`.
+
+    Reads the current ids (unless `current` is given, e.g. [] for a new owner),
+    then issues at most one multi-row INSERT and one DELETE. Run it in the same
+    transaction as the owner's own update.
+
+    Returns (added ids, removed ids).
+    """
+    field = model._meta.fields_map[relation]
+    through = Table(field.through)
+    backward, forward = through[field.backward_key], through[field.forward_key]
+    if current is None:
+        query = using_db.query_class.from_(through).select(forward).where(backward == owner_id)
+        rows = await using_db.execute_query_dict(*query.get_parameterized_sql())
+        current = [row[field.forward_key] for row in rows]
+
+    wanted, current = set(related_ids), set(current)
+    added, removed = wanted - current, current - wanted
+    if added:
+        await add_links(model, relation, ((owner_id, related_id) for related_id in sorted(added)), using_db)
+    if removed:
+        query = using_db.query_class.from_(through) \
+            .where((backward == owner_id) & forward.isin(sorted(removed))).delete()
+        await using_db.execute_query(*query.get_parameterized_sql())
+        BaseRepository.invalidate_tables(field.through)
+    return added, removed
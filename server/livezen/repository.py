@@ -1,66 +1,331 @@
-from typing import List, Optional, Tuple, Type, TypeVar, Generic
+import base64
+import binascii
+import json
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Hashable, List, Optional, Sequence, Tuple, Type, TypeVar, Generic
+from pydantic import BaseModel
 from tortoise.expressions import Q
+from tortoise.fields.relational import ManyToManyFieldInstance
 from tortoise.models import Model
+from tortoise.queryset import QuerySet
+from tortoise.transactions import in_transaction
+
+from livezen.cache import TTLCache, q_key
+from livezen.conditional import table_versions
+from livezen.config import COUNT_CACHE_SIZE, COUNT_CACHE_STALE_TTL, COUNT_CACHE_TTL, WRITE_CONNECTION
+from livezen.db import read_db
+from livezen.enums import TotalMode
+from livezen.exceptions import ValidationException
+from livezen.projection import project
+from livezen.search import PkSubquery
 
 T = TypeVar("T", bound=Model)  # T is any Tortoise model
 
 
+@lru_cache(maxsize=1024)
+def filter_tables(model: Type[Model], key: Hashable) -> FrozenSet[str]:
+    """
+    Tables a filter on `model` (given as its q_key()) reads: the model's own, and
+    the related and join tables of every relation its lookups cross.
+    """
+    tables = {model._meta.db_table}
+    if key == ():
+        return frozenset(tables)
+    _, _, filters, children = key
+    for name, value in filters:
+        related = model
+        for part in name.split("__"):
+            if part not in related._meta.fetch_fields:
+                break
+            field = related._meta.fields_map[part]
+            if isinstance(field, ManyToManyFieldInstance):
+                tables.add(field.through)
+            related = field.related_model
+            tables.add(related._meta.db_table)
+        if isinstance(value, PkSubquery):
+            tables |= filter_tables(value.model, q_key(value.q))
+    for child in children:
+        tables |= filter_tables(model, child)
+    return frozenset(tables)
+
+
+def _cursor_default(value: Any) -> str:
+    # datetimes, dates, UUIDs and decimals are stored in their string form
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_cursor(order: List[str], values: List[Any]) -> str:
+    """Encode the sort keys of the last row of a page into an opaque cursor."""
+    payload = json.dumps({"o": order, "v": values}, default=_cursor_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, order: List[str]) -> List[Any]:
+    """Decode a cursor produced by `encode_cursor` for the given ordering."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = payload["v"]
+        cursor_order = payload["o"]
+    except (binascii.Error, ValueError, UnicodeError, TypeError, KeyError):
+        raise ValidationException("Invalid pagination cursor")
+    if cursor_order != order or not isinstance(values, list) or len(values) != len(order):
+        raise ValidationException("Pagination cursor does not match the requested ordering")
+    return values
+
+
 class BaseRepository(Generic[T]):
+    """
+    Generic data access for one model.
+
+    Reads run on `read_db()` (the replica when configured), writes on the
+    model's default connection.
+    """
     model: Type[T]  # the model class (e.g., Course, Subject)
+    # Whether writes bump the table's row in table_version: set on the repositories
+    # of tables a `Conditional` route is built from, the others skip that write
+    versioned: bool = False
+
+    # Shared by every repository: (table, normalized filter) -> (generation, total)
+    _count_cache: TTLCache[Tuple[int, int]] = TTLCache(
+        maxsize=COUNT_CACHE_SIZE, ttl=COUNT_CACHE_STALE_TTL)
+    # Bumped on every write to a table (through a repository or relations.py), so
+    # cached totals of filters reading it are dropped
+    _count_generations: Dict[str, int] = {}
 
     def __init__(self, model: Type[T]):
         self.model = model
 
+    def _read(self, *args, **kwargs) -> QuerySet[T]:
+        """A filtered queryset bound to the read connection."""
+        query = self.model.filter(*args, **kwargs) if args or kwargs else self.model.all()
+        return query.using_db(read_db())
+
     async def paginated(
         self,
         page: int,
         page_size: int,
         search: Optional[Q] = None,
         order: Optional[List[str]] = None,
-        prefetch: Optional[List[str]] = None
-    ) -> Tuple[int, List[T]]:
-        query = self.model.filter(search) if search else self.model.all()
-        if prefetch:
-            query = query.prefetch_related(*prefetch)
+        prefetch: Optional[List[str]] = None,
+        total_mode: TotalMode = TotalMode.exact,
+        projection: Optional[Type[BaseModel]] = None
+    ) -> Tuple[Optional[int], List[T]]:
+        """
+        Offset pagination. With `projection`, rows are plain dicts shaped like that
+        response model (see livezen.projection) instead of model instances.
+        """
+        query = self._read(search) if search else self._read()
         if order:
             query = query.order_by(*order)
 
+        total = await self.count(search, total_mode)
+        records = await self._fetch(
+            query.offset((page - 1) * page_size).limit(page_size), prefetch, projection)
+        return total, records
+
+    async def count(self, search: Optional[Q] = None, total_mode: TotalMode = TotalMode.exact) -> Optional[int]:
+        """
+        Count the rows matching `search`, reusing cached totals.
+
+        - exact: cached totals are reused for COUNT_CACHE_TTL seconds and dropped on
+          any write through this process to a table the filter reads (the model's,
+          and those of the relations it crosses, join tables included). Other
+          workers' writes show up once the TTL runs out.
+        - estimate: the last exact total, even if rows were written since, for up to
+          COUNT_CACHE_STALE_TTL seconds. A filter that was never counted is counted
+          exactly once.
+        - none: no count at all, returns None.
+        """
+        if total_mode == TotalMode.none:
+            return None
+
+        search_key = q_key(search)
+        generation = self._generation(filter_tables(self.model, search_key))
+        key = (self.model._meta.db_table, search_key)
+        if total_mode == TotalMode.estimate:
+            cached = self._count_cache.get(key)
+        else:
+            cached = self._count_cache.get(key, max_age=COUNT_CACHE_TTL)
+            if cached and cached[0] != generation:
+                cached = None
+        if cached:
+            return cached[1]
+
+        query = self._read(search) if search else self._read()
         total = await query.count()
-        records = await query.offset((page - 1) * page_size).limit(page_size)
-        return total, list(records)
+        self._count_cache.set(key, (generation, total))
+        return total
+
+    @classmethod
+    def _generation(cls, tables: FrozenSet[str]) -> int:
+        return sum(cls._count_generations.get(table, 0) for table in tables)
+
+    @classmethod
+    def invalidate_tables(cls, *tables: str) -> None:
+        """Drop cached totals of every filter reading one of `tables`."""
+        for table in tables:
+            cls._count_generations[table] = cls._count_generations.get(table, 0) + 1
+
+    def invalidate_counts(self) -> None:
+        """Drop cached totals for this repository's table."""
+        self.invalidate_tables(self.model._meta.db_table)
+
+    async def touch(self) -> None:
+        """
+        Record a change to this repository's table: drops cached totals and, if
+        `versioned`, bumps the table version that conditional GETs derive their
+        ETags from.
+
+        Called by create/update/delete; call it again after changing relations
+        (M2M adds/removes) outside of those.
+        """
+        self.invalidate_counts()
+        if self.versioned:
+            await table_versions.bump(self.model._meta.db_table)
+
+    def _writing(self):
+        """Transaction for a write and its version bump, so the two commit together."""
+        return in_transaction(WRITE_CONNECTION) if self.versioned else nullcontext()
+
+    async def keyset_paginated(
+        self,
+        page_size: int,
+        after: Optional[str] = None,
+        search: Optional[Q] = None,
+        order: Optional[List[str]] = None,
+        prefetch: Optional[List[str]] = None,
+        projection: Optional[Type[BaseModel]] = None
+    ) -> Tuple[List[T], Optional[str]]:
+        """
+        Cursor (keyset) pagination.
+
+        Instead of COUNT + OFFSET, rows are selected with a "sort keys greater than
+        the last seen keys" condition, so a page costs the same no matter how deep
+        the client has scrolled. The primary key is always appended to the ordering
+        as a tie breaker.
+
+        Returns:
+            (records, next_cursor)
+            - next_cursor: Opaque token for the following page, None on the last page.
+        """
+        order = self._keyset_order(order)
+        query = self._read(search) if search else self._read()
+        if after:
+            values = self._keyset_values(order, decode_cursor(after, order))
+            query = query.filter(self._keyset_condition(order, values))
+
+        # Fetch one extra row to know whether there is a next page
+        keys = [key.lstrip("-") for key in order]
+        records = await self._fetch(query.order_by(*order).limit(page_size + 1), prefetch, projection, keys)
+        next_cursor = None
+        if len(records) > page_size:
+            records = records[:page_size]
+            last = records[-1]
+            next_cursor = encode_cursor(
+                order, [last[key] if projection else getattr(last, key) for key in keys])
+        if projection:
+            # Sort keys the response model does not expose were only needed for the cursor
+            hidden = [key for key in keys if key not in projection.model_fields]
+            for record in records:
+                for key in hidden:
+                    del record[key]
+        return records, next_cursor
+
+    async def _fetch(
+        self,
+        query: QuerySet[T],
+        prefetch: Optional[List[str]] = None,
+        projection: Optional[Type[BaseModel]] = None,
+        extra_columns: Sequence[str] = ()
+    ) -> List[Any]:
+        if projection is not None:
+            return await project(self.model, query, projection, extra_columns)
+        if prefetch:
+            query = query.prefetch_related(*prefetch)
+        return list(await query)
+
+    def _keyset_order(self, order: Optional[List[str]]) -> List[str]:
+        meta = self.model._meta
+        keys = list(order or [])
+        for key in keys:
+            name = key.lstrip("-")
+            field = meta.fields_map.get(name)
+            if field is None or name in meta.fetch_fields or field.null:
+                raise ValidationException(
+                    f"Cannot use '{name}' for cursor pagination")
+        if meta.pk_attr not in [key.lstrip("-") for key in keys]:
+            descending = bool(keys) and keys[-1].startswith("-")
+            keys.append(f"-{meta.pk_attr}" if descending else meta.pk_attr)
+        return keys
+
+    def _keyset_values(self, order: List[str], values: List[Any]) -> List[Any]:
+        fields_map = self.model._meta.fields_map
+        try:
+            return [
+                fields_map[key.lstrip("-")].to_python_value(value)
+                for key, value in zip(order, values)
+            ]
+        except (TypeError, ValueError):
+            raise ValidationException("Invalid pagination cursor")
+
+    @staticmethod
+    def _keyset_condition(order: List[str], values: List[Any]) -> Q:
+        # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y)
+        condition: Optional[Q] = None
+        for key, value in reversed(list(zip(order, values))):
+            name = key.lstrip("-")
+            lookup = "lt" if key.startswith("-") else "gt"
+            term = Q(**{f"{name}__{lookup}": value})
+            if condition is not None:
+                term |= Q(Q(**{name: value}), condition)
+            condition = term
+        return condition
 
     async def create(self, **kwargs) -> T:
-        return await self.model.create(**kwargs)
+        async with self._writing():
+            instance = await self.model.create(**kwargs)
+            await self.touch()
+        return instance
 
     async def get(self, prefetch: Optional[List[str]] = None, **filters) -> Optional[T]:
-        query = self.model.filter(**filters)
+        query = self._read(**filters)
         if prefetch:
             query = query.prefetch_related(*prefetch)
         return await query.first()
 
     async def list(self, **filters) -> List[T]:
-        return await self.model.filter(**filters)
+        return await self._read(**filters)
 
     async def update(self, instance: T, **kwargs) -> T:
         for key, value in kwargs.items():
             setattr(instance, key, value)
-        await instance.save()
+        async with self._writing():
+            await instance.save()
+            await self.touch()
         return instance
 
     async def delete(self, instance_id: int) -> bool:
-        instance = await self.get(id=instance_id)
+        # Read on the writer: a replica may not have seen the row yet
+        instance = await self.model.filter(id=instance_id).first()
         if not instance:
             return False
-        await instance.delete()
+        async with self._writing():
+            await instance.delete()
+            await self.touch()
         return True
 
     async def exists(self, **kwargs) -> bool:
-        return await self.model.exists(**kwargs)
+        return await self._read(**kwargs).exists()
 
     async def filter(
         self,
         *args,  # Q objects or expressions
         prefetch: Optional[List[str]] = None,
+        projection: Optional[Type[BaseModel]] = None,
         **kwargs  # normal field filters
     ) -> List[T]:
         """
@@ -70,10 +335,7 @@ class BaseRepository(Generic[T]):
             await repo.filter(name__icontains="apple")
             await repo.filter(Q(categories__id=1) | Q(categories__id=2))
         """
-        query = self.model.filter(*args, **kwargs)
-        if prefetch:
-            query = query.prefetch_related(*prefetch)
-        return await query
+        return await self._fetch(self._read(*args, **kwargs), prefetch, projection)
 
     async def get_or_create(self, defaults: Optional[dict] = None, **kwargs) -> Tuple[T, bool]:
         """
@@ -86,7 +348,7 @@ class BaseRepository(Generic[T]):
         """
         defaults = defaults or {}
 
-        instance = await self.get(**kwargs)
+        instance = await self.model.filter(**kwargs).first()
         if instance:
             return instance, False
 
@@ -0,0 +1,138 @@
+"""
+JSON responses.
+
+`FastJSONResponse` renders with orjson when it is installed (5-10x faster than
+the stdlib on large pages, and it encodes datetimes, UUIDs and enums natively),
+falling back to `json`. `StreamingJSONResponse` encodes a large list a chunk at
+a time instead of building the whole body in memory. `gzip_stream` compresses a
+streamed body as it is produced.
+"""
+import datetime
+import decimal
+import enum
+import json
+import uuid
+import zlib
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Mapping, Optional, Union
+
+from starlette.responses import JSONResponse, StreamingResponse
+
+from livezen.config import JSON_STREAM_CHUNK_SIZE
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (uuid.UUID, decimal.Decimal)):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+else:
+    def dumps(content: Any) -> bytes:
+        return json.dumps(
+            content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+        ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Drop-in JSONResponse rendered with `dumps`."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class StreamingJSONResponse(StreamingResponse):
+    """
+    Streams `{**envelope, key: [*items]}`, encoding `chunk_size` items at a time.
+
+    Usage:
+        StreamingJSONResponse(rows, envelope={"page": 1, "total": None})
+        StreamingJSONResponse(async_row_generator(), key="data")
+    """
+
+    def __init__(
+        self,
+        items: Union[Iterable[Any], AsyncIterable[Any]],
+        envelope: Optional[Mapping[str, Any]] = None,
+        key: str = "data",
+        chunk_size: int = JSON_STREAM_CHUNK_SIZE,
+        **kwargs: Any,
+    ):
+        kwargs.setdefault("media_type", "application/json")
+        super().__init__(self._encode(items, envelope or {}, key, chunk_size), **kwargs)
+
+    @staticmethod
+    async def _encode(
+        items: Union[Iterable[Any], AsyncIterable[Any]],
+        envelope: Mapping[str, Any],
+        key: str,
+        chunk_size: int,
+    ) -> AsyncIterator[bytes]:
+        # The list goes last so the envelope can be written before the first item
+        head = b",".join(dumps(name) + b":" + dumps(value) for name, value in envelope.items() if name != key)
+        yield b"{" + head + (b"," if head else b"") + dumps(key) + b":["
+
+        chunk = []
+        first = True
+        async for item in _aiter(items):
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                # One encoder call per chunk, without the list's own brackets
+                yield (b"" if first else b",") + dumps(chunk)[1:-1]
+                chunk, first = [], False
+        if chunk:
+            yield (b"" if first else b",") + dumps(chunk)[1:-1]
+        yield b"]}"
+
+
+async def gzip_stream(chunks: AsyncIterable[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Gzip a byte stream on the fly, one compressor for the whole stream."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip header and trailer
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip: `gzip;q=0` refuses it, `*` stands in when gzip is not listed."""
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, *params = part.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+
+async def _aiter(items: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Any]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
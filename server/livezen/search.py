@@ -0,0 +1,202 @@
+"""
+Shared compiler for the `search`/`searchJoin` query parameters.
+
+    search="name:apple;type.slug:grocery;status:publish,draft"
+
+Each `key:value` term is only accepted when `key` is in the model's allowlist
+(`SearchSpec`), and is turned into the cheapest lookup for its column:
+
+- CONTAINS fields (free text)         -> `icontains`
+- EXACT fields (indexed/enum columns) -> `=`, `in` for "a,b", `startswith` for "ab*"
+
+Compiled results are cached per (spec, search string, join), so a repeated
+query string costs a dictionary lookup.
+"""
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple, Type
+
+from pypika_tortoise.context import SqlContext
+from pypika_tortoise.terms import Term
+from tortoise.expressions import Q, Subquery
+from tortoise.fields import BooleanField
+from tortoise.fields.base import Field
+from tortoise.fields.relational import BackwardFKRelation, BackwardOneToOneRelation, ManyToManyFieldInstance
+from tortoise.models import Model
+
+from livezen.cache import q_key
+
+CONTAINS = "contains"
+EXACT = "exact"
+
+# Matches no rows, used when a value cannot exist in its column
+_NOTHING = Q(id__in=[])
+
+# Spellings accepted for boolean columns (BooleanField.to_python_value treats any non-empty string as True)
+_BOOLEANS = {"true": True, "1": True, "false": False, "0": False}
+
+
+class SearchField:
+    """
+    An allowed search key.
+
+    Usage:
+        SearchField("name")                                  # icontains
+        SearchField("status", lookup=EXACT)                  # =, in, startswith
+        SearchField("first_name", "last_name", "email")      # OR across columns
+        SearchField("name", full_text=True)                  # may go to a full-text index, matched in its name column
+        SearchField("name", "description", full_text=True, text_columns=())  # ... matched in any indexed column
+    """
+
+    def __init__(
+        self, *paths: str, lookup: str = CONTAINS, full_text: bool = False, text_columns: Optional[Tuple[str, ...]] = None
+    ):
+        self.paths = paths
+        self.lookup = lookup
+        self.full_text = full_text
+        self.text_columns = paths if text_columns is None else tuple(text_columns)
+
+
+class TextTerm(NamedTuple):
+    columns: Tuple[str, ...]  # full-text columns to match in, empty for all of them
+    value: str
+
+
+class CompiledSearch(NamedTuple):
+    q: Q
+    # Terms of `full_text` fields, when the caller asked for full-text search
+    text: Tuple[TextTerm, ...] = ()
+
+
+class PkSubquery(Subquery):
+    """
+    `IN` operand `(SELECT pk FROM model WHERE q)`.
+
+    Compiled searches are cached and rendered on every request, so the queryset
+    is only built on the first render and its SQL query reused after that.
+    """
+
+    def __init__(self, model: Type[Model], q: Q):
+        Term.__init__(self)
+        self.model = model
+        self.q = q
+        self._query = None
+
+    def _built(self):
+        if self._query is None:
+            query = self.model.filter(self.q).values(self.model._meta.pk_attr)
+            query._choose_db_if_not_chosen()
+            query._make_query()
+            self._query = query.query
+        return self._query
+
+    def get_sql(self, ctx: SqlContext) -> str:
+        return self._built().get_parameterized_sql(ctx)[0]
+
+    def as_(self, alias: str):
+        return self._built().as_(alias)
+
+    # Compared by filter, not as SQL terms, so cache keys holding one (see q_key) stay cheap
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PkSubquery) and (self.model, q_key(self.q)) == (other.model, q_key(other.q))
+
+    def __hash__(self) -> int:
+        return hash((self.model, q_key(self.q)))
+
+
+class SearchSpec:
+    """Per-model allowlist of search keys."""
+
+    def __init__(self, model: Type[Model], fields: Dict[str, SearchField]):
+        self.model = model
+        self.fields = fields
+        # Paths crossing a to-many relation, whose join repeats the model's rows
+        self._to_many = {path for field in fields.values() for path in field.paths if self._fans_out(path)}
+
+    def compile(self, search: Optional[str], join: str = "and", full_text: bool = False) -> CompiledSearch:
+        if not search:
+            return CompiledSearch(Q())
+        return _compile(self, search, join.lower() == "or", full_text)
+
+    def _field(self, path: str) -> Optional[Field]:
+        model = self.model
+        *relations, name = path.split("__")
+        for relation in relations:
+            model = model._meta.fields_map[relation].related_model
+        return model._meta.fields_map.get(name)
+
+    def _fans_out(self, path: str) -> bool:
+        model = self.model
+        for relation in path.split("__")[:-1]:
+            field = model._meta.fields_map[relation]
+            if isinstance(field, ManyToManyFieldInstance) or (
+                    isinstance(field, BackwardFKRelation) and not isinstance(field, BackwardOneToOneRelation)):
+                return True
+            model = field.related_model
+        return False
+
+    def _condition(self, field: SearchField, conditions: List[Q]) -> Q:
+        """
+        OR of a field's per-path conditions. Those on to-many paths go through one
+        `pk IN (subquery)`, so a row matching several related rows is still
+        returned (and counted) once.
+        """
+        if self._to_many.isdisjoint(field.paths):
+            return conditions[0] if len(conditions) == 1 else Q(*conditions, join_type=Q.OR)
+        direct = [q for path, q in zip(field.paths, conditions) if path not in self._to_many]
+        to_many = [q for path, q in zip(field.paths, conditions) if path in self._to_many]
+        if to_many:
+            pk = self.model._meta.pk_attr
+            q = to_many[0] if len(to_many) == 1 else Q(*to_many, join_type=Q.OR)
+            direct.append(Q(**{f"{pk}__in": PkSubquery(self.model, q)}))
+        return direct[0] if len(direct) == 1 else Q(*direct, join_type=Q.OR)
+
+    def _exact(self, path: str, value: str) -> Q:
+        if value.endswith("*") and len(value) > 1:
+            return Q(**{f"{path}__startswith": value[:-1]})
+
+        field = self._field(path)
+        values: List = []
+        for item in value.split(","):
+            if isinstance(field, BooleanField):
+                if item.lower() in _BOOLEANS:
+                    values.append(_BOOLEANS[item.lower()])
+                continue
+            try:
+                # Values the column cannot hold (bad enum member, non-numeric id) match nothing
+                values.append(field.to_python_value(item) if field else item)
+            except (TypeError, ValueError):
+                continue
+        if not values:
+            return _NOTHING
+        if len(values) == 1:
+            return Q(**{path: values[0]})
+        return Q(**{f"{path}__in": values})
+
+
+@lru_cache(maxsize=1024)
+def _compile(spec: SearchSpec, search: str, join_or: bool, full_text: bool) -> CompiledSearch:
+    conditions: List[Q] = []
+    text_terms: List[TextTerm] = []
+    for term in search.split(";"):
+        key, sep, value = term.partition(":")
+        field = spec.fields.get(key)
+        if not sep or not value or field is None:
+            continue  # skip invalid or unknown filters
+
+        if field.full_text and full_text and not join_or:
+            text_terms.append(TextTerm(field.text_columns, value))
+            continue
+
+        if field.lookup == EXACT:
+            alternatives = [spec._exact(path, value) for path in field.paths]
+        else:
+            alternatives = [Q(**{f"{path}__icontains": value}) for path in field.paths]
+        conditions.append(spec._condition(field, alternatives))
+
+    if not conditions:
+        q = Q()
+    elif len(conditions) == 1:
+        q = conditions[0]
+    else:
+        q = Q(*conditions, join_type=Q.OR if join_or else Q.AND)
+    return CompiledSearch(q, tuple(text_terms))
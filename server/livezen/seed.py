@@ -1,50 +1,288 @@
-import asyncio
-from tortoise import Tortoise, run_async
+"""
+Synthetic catalog generator.
 
-from livezen.type.models import Type
+Fills an empty database with a catalog of configurable size, so performance
+work can be reproduced locally at production-like volumes:
+
+    python -m livezen.seed                          # small: 5k products
+    python -m livezen.seed --scale large            # 1M products, 5M wishlist rows
+    python -m livezen.seed --products 200000 --seed 7 --schema
+
+The data is deterministic for a given --seed and skewed the way real catalogs
+are: category trees are deep and uneven, a few categories/tags/products are far
+more popular than the rest (Zipf), prices are log-normal and wishlist sizes are
+heavy-tailed. Rows go in with `bulk_create` and multi-row join-table INSERTs,
+one transaction per batch.
+"""
+import argparse
+import random
+import time
+import uuid
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type as ModelType
+
+from slugify import slugify
+from tortoise import Tortoise, connections, run_async
+from tortoise.models import Model
+from tortoise.transactions import in_transaction
+from tortoise.utils import generate_schema_for_client
+
+from livezen.auth.models import LivezenUser
 from livezen.category.models import Category
+from livezen.conditional import table_versions
+from livezen.config import TORTOISE_ORM, WRITE_CONNECTION
+from livezen.core.security import hash_password
+from livezen.enums import ProductStatus, ProductType, UserRole
+from livezen.product.models import Product
+from livezen.relations import add_links
+from livezen.tag.models import Tag
+from livezen.type.models import Type
+from livezen.wishlist.models import Wishlist
+
+SCALES: Dict[str, Dict[str, int]] = {
+    "small": dict(types=3, categories=100, tags=200, products=5_000, users=500, wishlists=5_000),
+    "medium": dict(types=5, categories=1_000, tags=2_000, products=100_000, users=10_000, wishlists=200_000),
+    "large": dict(types=8, categories=10_000, tags=20_000, products=1_000_000, users=100_000, wishlists=5_000_000),
+}
+
+TYPE_NAMES = ["Grocery", "Bakery", "Makeup", "Bags", "Clothing", "Furniture", "Daily Needs", "Books"]
+# Short words, so "<word> <number>" stays within the 20-character name columns
+WORDS = [
+    "Apple", "Banana", "Cherry", "Bread", "Butter", "Cheese", "Coffee", "Tea", "Rice", "Pasta",
+    "Honey", "Olive", "Salmon", "Tomato", "Onion", "Pepper", "Lemon", "Mango", "Yogurt", "Cookie",
+    "Lipstick", "Serum", "Shampoo", "Soap", "Candle", "Blanket", "Pillow", "Chair", "Table", "Lamp",
+    "Shirt", "Jacket", "Scarf", "Boots", "Wallet", "Backpack", "Tote", "Novel", "Atlas", "Journal",
+]
+UNITS = ["1 kg", "500 g", "1 pc", "1 l", "250 ml", "12 pcs", "1 pack"]
+SEED_PASSWORD = "Passw0rd!"
+
+# Zipf exponent: ~1 gives the usual "a few items get most of the traffic" shape
+SKEW = 1.1
+MAX_CATEGORY_DEPTH = 6
+
+
+def zipf_weights(n: int, skew: float = SKEW) -> List[float]:
+    """Cumulative Zipf weights for `rng.choices(..., cum_weights=...)`; index 0 is the most popular."""
+    return list(accumulate(1 / (rank + 1) ** skew for rank in range(n)))
+
+
+def _name(word: str, number: int) -> str:
+    return f"{word} {number}"[:20]
+
+
+class Generator:
+    def __init__(self, seed: int = 42, batch_size: int = 5_000):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+
+    async def run(self, types: int, categories: int, tags: int, products: int, users: int, wishlists: int) -> None:
+        started = time.perf_counter()
+        type_ids = await self.types(types)
+        category_ids = await self.categories(categories, type_ids)
+        tag_ids = await self.tags(tags, type_ids)
+        product_ids = await self.products(products, type_ids, category_ids, tag_ids)
+        user_ids = await self.users(users)
+        await self.wishlists(wishlists, user_ids, product_ids)
+        for model in (Type, Category, Tag, Product):
+            await table_versions.bump(model._meta.db_table)
+        print(f"✅ Seeding completed in {time.perf_counter() - started:.1f}s")
+
+    async def types(self, count: int) -> List[int]:
+        objects = []
+        for index in range(count):
+            name = TYPE_NAMES[index] if index < len(TYPE_NAMES) else _name("Type", index)
+            objects.append(Type(
+                name=name, slug=slugify(name), icon=slugify(name)[:20], translated_languages=["en"],
+                banners=[], promotional_sliders=[]))
+        return await self._insert(Type, objects, "types")
+
+    async def categories(self, count: int, type_ids: Sequence[int]) -> List[int]:
+        """
+        Category forests, one per type. Each category becomes a child of an
+        existing one (skewed towards the oldest, up to MAX_CATEGORY_DEPTH levels)
+        or a new root, which gives a few broad, deep trees and many small ones.
+        """
+        # Parents must exist before their children are inserted: one level at a time
+        levels: List[List[Tuple[int, Optional[int], int]]] = [[] for _ in range(MAX_CATEGORY_DEPTH)]
+        depth: List[int] = []
+        type_of: List[int] = []
+        for index in range(count):
+            parent = None
+            if index and self.rng.random() < 0.8:
+                # Preferential attachment: early (popular) categories collect most children
+                candidate = min(int(self.rng.paretovariate(1.2)) - 1, index - 1)
+                if depth[candidate] + 1 < MAX_CATEGORY_DEPTH:
+                    parent = candidate
+            depth.append(0 if parent is None else depth[parent] + 1)
+            type_of.append(self.rng.choice(type_ids) if parent is None else type_of[parent])
+            levels[depth[index]].append((index, parent, type_of[index]))
+
+        ids: List[Optional[int]] = [None] * count
+        for level in levels:
+            objects = []
+            for index, parent, type_id in level:
+                name = _name(self.rng.choice(WORDS), index)
+                objects.append(Category(
+                    name=name, slug=slugify(name), icon="category", type_id=type_id,
+                    parent_id=None if parent is None else ids[parent], translated_languages=["en"]))
+            for (index, _, _), category_id in zip(level, await self._insert(Category, objects, None)):
+                ids[index] = category_id
+        print(f"🌱 categories: {count} ({sum(1 for level in levels if level)} levels)")
+        return ids
+
+    async def tags(self, count: int, type_ids: Sequence[int]) -> List[int]:
+        objects = []
+        for index in range(count):
+            name = _name(self.rng.choice(WORDS), index)
+            objects.append(Tag(name=name, slug=slugify(name), icon="tag", type_id=self.rng.choice(type_ids)))
+        return await self._insert(Tag, objects, "tags")
+
+    async def products(
+        self, count: int, type_ids: Sequence[int], category_ids: Sequence[int], tag_ids: Sequence[int]
+    ) -> List[int]:
+        category_weights = zipf_weights(len(category_ids))
+        tag_weights = zipf_weights(len(tag_ids))
+        ids: List[int] = []
+        for start in range(0, count, self.batch_size):
+            objects, categories, tags = [], [], []
+            for index in range(start, min(start + self.batch_size, count)):
+                name = _name(self.rng.choice(WORDS), index)
+                price = round(self.rng.lognormvariate(3, 1), 2)
+                objects.append(Product(
+                    name=name,
+                    slug=slugify(name),
+                    status=ProductStatus.publish if self.rng.random() < 0.9 else ProductStatus.draft,
+                    product_type=ProductType.simple,
+                    price=price,
+                    sale_price=round(price * self.rng.choice((1, 1, 1, 0.9, 0.75)), 2),
+                    sku=index + 1,
+                    unit=self.rng.choice(UNITS),
+                    description=" ".join(self.rng.choices(WORDS, k=self.rng.randint(5, 30))).lower(),
+                    quantity=int(self.rng.paretovariate(1.5) * 10) - 10,
+                    type_id=self.rng.choice(type_ids),
+                ))
+                categories.append(set(self._pick(category_ids, category_weights, self.rng.choice((1, 1, 1, 2, 2, 3)))))
+                tags.append(set(self._pick(tag_ids, tag_weights, min(int(self.rng.expovariate(0.7)), 8))))
+
+            async with in_transaction(WRITE_CONNECTION) as db:
+                batch_ids = await self._bulk_create(Product, objects, db)
+                await add_links(Product, "categories", [
+                    (product_id, category_id)
+                    for product_id, related in zip(batch_ids, categories) for category_id in related
+                ], db)
+                await add_links(Product, "tags", [
+                    (product_id, tag_id) for product_id, related in zip(batch_ids, tags) for tag_id in related
+                ], db)
+            ids.extend(batch_ids)
+            self._progress("products", len(ids), count)
+        print(f"🌱 products: {len(ids)}")
+        return ids
+
+    async def users(self, count: int) -> List[Any]:
+        password = hash_password(SEED_PASSWORD, rounds=4)  # one hash for everyone, at the lowest cost
+        objects = []
+        for index in range(count):
+            first, last = self.rng.choice(WORDS), self.rng.choice(WORDS)
+            objects.append(LivezenUser(
+                id=uuid.UUID(int=self.rng.getrandbits(128), version=4),
+                email=f"user{index}@example.com",
+                first_name=first, last_name=last, full_name=f"{first} {last}",
+                password=password,
+                role=UserRole.admin if index == 0 else UserRole.customer,
+            ))
+        ids = [user.id for user in objects]
+        await self._insert(LivezenUser, objects, "users", return_ids=False)
+        return ids
+
+    async def wishlists(self, count: int, user_ids: Sequence[Any], product_ids: Sequence[int]) -> None:
+        """Heavy-tailed wishlist sizes per user, products picked by popularity, no duplicate pairs."""
+        if not user_ids or not product_ids:
+            return
+        count = min(count, len(user_ids) * len(product_ids))
+        product_weights = zipf_weights(len(product_ids))
+        sizes = [self.rng.paretovariate(1.3) for _ in user_ids]
+        scale = count / sum(sizes)
+        created = 0
+        due = 0.0  # running target: rounding and users capped at every product roll over to the next
+        objects: List[Wishlist] = []
+        for position, (user_id, size) in enumerate(zip(user_ids, sizes)):
+            due += size * scale
+            # ...but at least what the users after this one cannot hold, so the last
+            # user tops the total up to exactly `count`
+            rest = count - created - (len(user_ids) - position - 1) * len(product_ids)
+            wanted = min(max(int(due) - created, rest), len(product_ids), count - created)
+            picked = set(self._pick(product_ids, product_weights, wanted))
+            while len(picked) < wanted:  # the popular head is small: fill up uniformly
+                picked.add(self.rng.choice(product_ids))
+            objects.extend(Wishlist(user_id=user_id, product_id=product_id) for product_id in picked)
+            created += len(picked)
+            if len(objects) >= self.batch_size:
+                await self._insert(Wishlist, objects, None, return_ids=False)
+                objects = []
+                self._progress("wishlists", created, count)
+            if created >= count:
+                break
+        await self._insert(Wishlist, objects, None, return_ids=False)
+        print(f"🌱 wishlists: {created}")
+
+    def _progress(self, label: str, done: int, total: int) -> None:
+        if done < total and done // self.batch_size % 20 == 0:
+            print(f"   {label}: {done}/{total}")
 
+    def _pick(self, population: Sequence[Any], cum_weights: List[float], k: int) -> List[Any]:
+        return self.rng.choices(population, cum_weights=cum_weights, k=k) if k > 0 else []
 
-async def seed():
-    print("🌱 Starting database seeding...")
+    async def _insert(
+        self, model: ModelType[Model], objects: List[Model], label: Optional[str], return_ids: bool = True
+    ) -> List[int]:
+        ids: List[int] = []
+        for start in range(0, len(objects), self.batch_size):
+            async with in_transaction(WRITE_CONNECTION) as db:
+                batch = objects[start:start + self.batch_size]
+                if return_ids:
+                    ids.extend(await self._bulk_create(model, batch, db))
+                else:
+                    await model.bulk_create(batch, using_db=db)
+        if label:
+            print(f"🌱 {label}: {len(objects)}")
+        return ids
 
-    # --- Example 1: Create Types ---
-    grocery, _ = await Type.get_or_create(
-        name="Grocery",
-        slug="grocery",
-        defaults={
-            "translated_languages": ["en"],
-            "banners": [],
-            "promotional_sliders": [],
-        }
-    )
+    @staticmethod
+    async def _bulk_create(model: ModelType[Model], objects: List[Model], db) -> List[int]:
+        """bulk_create does not return ids on every backend: read them back by position."""
+        last = await model.all().using_db(db).order_by("-id").first().values_list("id", flat=True) or 0
+        await model.bulk_create(objects, using_db=db)
+        ids = await model.filter(id__gt=last).using_db(db).order_by("id").values_list("id", flat=True)
+        assert len(ids) == len(objects), f"expected {len(objects)} new {model.__name__} rows, found {len(ids)}"
+        return ids
 
-    await Type.get_or_create(
-        name="Fruits",
-        slug="fruits",
-        parent=grocery
-    )
 
-    # --- Example 2: Create a Category ---
-    await Category.get_or_create(
-        name="Fresh Fruits",
-        slug="fresh-fruits",
-        type=grocery
-    )
+async def _main(args: argparse.Namespace, volumes: Dict[str, int]) -> None:
+    # run_async closes the connections afterwards
+    await Tortoise.init(config=TORTOISE_ORM)
+    if args.schema:
+        # Only on the writer: SQLite's reader connections are read-only
+        await generate_schema_for_client(connections.get(WRITE_CONNECTION), safe=True)
+    if await Product.exists():
+        raise SystemExit("The database already has products: seed an empty database")
+    print(f"🌱 Seeding {', '.join(f'{count} {name}' for name, count in volumes.items())} (seed {args.seed})")
+    await Generator(seed=args.seed, batch_size=args.batch_size).run(**volumes)
 
-    print("✅ Seeding completed successfully.")
 
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic catalog.")
+    parser.add_argument("--scale", choices=SCALES, default="small", help="Preset volumes, overridden by the flags below")
+    for name in SCALES["small"]:
+        parser.add_argument(f"--{name}", type=int)
+    parser.add_argument("--seed", type=int, default=42, help="Same seed, same data")
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--schema", action="store_true", help="Create missing tables first")
+    args = parser.parse_args(argv)
 
-async def init():
-    ...
-    # await Tortoise.init(
-    #     db_url="sqlite://db.sqlite3",  # update to match your DATABASE_URL
-    #     modules={"models": ["app.models"]},
-    # )
-    # await Tortoise.generate_schemas()
-    # await seed()
-    # await Tortoise.close_connections()
+    volumes = {name: getattr(args, name) if getattr(args, name) is not None else count
+               for name, count in SCALES[args.scale].items()}
+    run_async(_main(args, volumes))
 
 
 if __name__ == "__main__":
-    run_async(init())
+    main()
@@ -0,0 +1,21 @@
+from typing import Any, Dict, Optional
+from pydantic import BaseModel
+from tortoise import fields, models
+
+from livezen.models import TimestampMixin
+
+
+class Setting(models.Model, TimestampMixin):
+    id = fields.BigIntField(pk=True, index=True)
+    language = fields.CharField(max_length=10, unique=True)
+    options = fields.JSONField(default=dict)
+    # Bumped on every update, clients revalidate against it through the ETag
+    version = fields.IntField(default=1)
+
+    class Meta:
+        table = "setting"
+
+
+class SettingUpdate(BaseModel):
+    options: Dict[str, Any]
+    language: Optional[str] = None
@@ -0,0 +1,23 @@
+from typing import Any, Optional
+
+from tortoise.expressions import F
+
+from livezen.repository import BaseRepository
+
+from .models import Setting
+
+
+class SettingRepository(BaseRepository[Setting]):
+    def __init__(self):
+        super().__init__(Setting)
+
+    async def version(self, language: str) -> Optional[int]:
+        versions = await self._read(language=language).values_list("version", flat=True)
+        return versions[0] if versions else None
+
+    async def bump(self, setting: Setting, **kwargs: Any) -> Setting:
+        """Update `setting` and increment its version in one statement."""
+        await self.model.filter(id=setting.id).update(version=F("version") + 1, **kwargs)
+        self.invalidate_counts()
+        await setting.refresh_from_db()
+        return setting
@@ -0,0 +1,85 @@
+import asyncio
+import gzip
+import time
+from typing import Dict, NamedTuple, Optional
+
+from livezen.config import SETTINGS_RECHECK_INTERVAL
+from livezen.responses import dumps
+
+from .defaults import DEFAULT_LANGUAGE, DEFAULT_OPTIONS
+from .models import Setting, SettingUpdate
+from .repository import SettingRepository
+
+
+class SettingsPayload(NamedTuple):
+    """One settings version, serialized once and reused until the version changes."""
+    version: int
+    etag: str
+    body: bytes
+    gzipped: bytes
+
+
+def _serialize(setting: Setting) -> SettingsPayload:
+    body = dumps({
+        "id": setting.id,
+        "options": setting.options,
+        "language": setting.language,
+        "version": setting.version,
+        "created_at": setting.created_at,
+        "updated_at": setting.updated_at,
+    })
+    return SettingsPayload(
+        version=setting.version,
+        etag=f'"settings-{setting.language}-{setting.version}"',
+        body=body,
+        gzipped=gzip.compress(body, compresslevel=9, mtime=0),
+    )
+
+
+class SettingsService:
+    def __init__(self, repository: SettingRepository):
+        self.repository = repository
+        self._payloads: Dict[str, SettingsPayload] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def payload(self, language: str = DEFAULT_LANGUAGE) -> Optional[SettingsPayload]:
+        """
+        Serialized settings for `language`.
+
+        The stored version is rechecked at most every SETTINGS_RECHECK_INTERVAL
+        seconds (one indexed lookup), so updates made by other workers are
+        picked up without re-serializing on every request.
+        """
+        payload = self._payloads.get(language)
+        if payload and time.monotonic() - self._checked_at.get(language, 0) < SETTINGS_RECHECK_INTERVAL:
+            return payload
+
+        async with self._lock:
+            payload = self._payloads.get(language)
+            version = await self.repository.version(language)
+            if version is None and language == DEFAULT_LANGUAGE:
+                setting, _ = await self.repository.get_or_create(
+                    language=language, defaults={"options": DEFAULT_OPTIONS})
+                payload = self._store(setting)
+            elif version is None:
+                self._payloads.pop(language, None)
+                payload = None
+            elif payload is None or payload.version != version:
+                payload = self._store(await self.repository.get(language=language))
+            self._checked_at[language] = time.monotonic()
+            return payload
+
+    async def update(self, setting_in: SettingUpdate) -> SettingsPayload:
+        """Replace the options of a language and bump its version."""
+        language = setting_in.language or DEFAULT_LANGUAGE
+        setting, created = await self.repository.get_or_create(
+            language=language, defaults={"options": setting_in.options})
+        if not created:
+            setting = await self.repository.bump(setting, options=setting_in.options)
+        return self._store(setting)
+
+    def _store(self, setting: Setting) -> SettingsPayload:
+        payload = self._payloads[setting.language] = _serialize(setting)
+        self._checked_at[setting.language] = time.monotonic()
+        return payload
@@ -1,228 +1,46 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query
+from starlette.requests import Request
+from starlette.responses import Response
+
+from livezen.auth.permissions import AdminPermission, PermissionsDependency
+from livezen.conditional import etag_matches
+from livezen.responses import accepts_gzip
+
+from .defaults import DEFAULT_LANGUAGE
+from .models import SettingUpdate
+from .repository import SettingRepository
+from .service import SettingsPayload, SettingsService
 
 router = APIRouter()
+service = SettingsService(SettingRepository())
+
+
+def _settings_response(request: Request, payload: SettingsPayload, conditional: bool = True) -> Response:
+    """The pre-serialized payload, gzipped when accepted, or a 304 when the client is current."""
+    gzipped = accepts_gzip(request.headers.get("accept-encoding", ""))
+    # A strong ETag identifies exact bytes, so each encoding gets its own
+    etag = payload.etag[:-1] + '-gzip"' if gzipped else payload.etag
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if conditional and etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+        return Response(payload.gzipped, media_type="application/json", headers=headers)
+    return Response(payload.body, media_type="application/json", headers=headers)
 
 
 @router.get("")
-def application_settings(
+async def application_settings(
+    request: Request,
+    language: str = Query(DEFAULT_LANGUAGE, description="Settings language"),
 ):
-    return {
-        "id": 1,
-        "options": {
-            "deliveryTime": [
-                {
-                    "title": "Express Delivery",
-                    "description": "90 min express delivery"
-                },
-                {
-                    "title": "Morning",
-                    "description": "8.00 AM - 11.00 AM"
-                },
-                {
-                    "title": "Noon",
-                    "description": "11.00 AM - 2.00 PM"
-                },
-                {
-                    "title": "Afternoon",
-                    "description": "2.00 PM - 5.00 PM"
-                },
-                {
-                    "title": "Evening",
-                    "description": "5.00 PM - 8.00 PM"
-                }
-            ],
-            "isProductReview": False,
-            "useGoogleMap": False,
-            "enableTerms": True,
-            "enableCoupons": True,
-            "enableReviewPopup": True,
-            "reviewSystem": {
-                "value": "review_single_time",
-                "name": "Give purchased product a review only for one time. (By default)"
-            },
-            "seo": {
-                "ogImage": None,
-                "ogTitle": None,
-                "metaTags": None,
-                "metaTitle": None,
-                "canonicalUrl": None,
-                "ogDescription": None,
-                "twitterHandle": None,
-                "metaDescription": None,
-                "twitterCardType": None
-            },
-            "logo": {
-                "thumbnail": "https://pickbazarlaravel.s3.ap-southeast-1.amazonaws.com/2295/conversions/Logo-new-thumbnail.jpg",
-                "original": "https://pickbazarlaravel.s3.ap-southeast-1.amazonaws.com/2295/Logo-new.png",
-                "id": 2298,
-                "file_name": "Logo-new.png"
-            },
-            "collapseLogo": {
-                "thumbnail": "https://pickbazarlaravel.s3.ap-southeast-1.amazonaws.com/2283/conversions/Pickbazar-thumbnail.jpg",
-                "original": "https://pickbazarlaravel.s3.ap-southeast-1.amazonaws.com/2283/Pickbazar.png",
-                "id": 2286,
-                "file_name": "Pickbazar.png"
-            },
-            "useOtp": False,
-            "currency": "USD",
-            "taxClass": "1",
-            "siteTitle": "Pickbazar",
-            "freeShipping": False,
-            "signupPoints": 100,
-            "siteSubtitle": "Your next ecommerce",
-            "shippingClass": "1",
-            "contactDetails": {
-                "contact": "+129290122122",
-                "socials": [
-                    {
-                        "url": "https://www.facebook.com/redqinc",
-                        "icon": "FacebookIcon"
-                    },
-                    {
-                        "url": "https://twitter.com/RedqTeam",
-                        "icon": "TwitterIcon"
-                    },
-                    {
-                        "url": "https://www.instagram.com/redqteam",
-                        "icon": "InstagramIcon"
-                    }
-                ],
-                "website": "https://redq.io",
-                "emailAddress": "demo@demo.com",
-                "location": {
-                    "lat": 42.9585979,
-                    "lng": -76.9087202,
-                    "zip": None,
-                    "city": None,
-                    "state": "NY",
-                    "country": "United States",
-                    "formattedAddress": "NY State Thruway, New York, USA"
-                }
-            },
-            "paymentGateway": [
-                {
-                    "name": "stripe",
-                    "title": "Stripe"
-                }
-            ],
-            "currencyOptions": {
-                "formation": "en-US",
-                "fractions": 2
-            },
-            "useEnableGateway": False,
-            "useCashOnDelivery": True,
-            "freeShippingAmount": 0,
-            "minimumOrderAmount": 0,
-            "useMustVerifyEmail": False,
-            "maximumQuestionLimit": 5,
-            "currencyToWalletRatio": 3,
-            "StripeCardOnly": False,
-            "guestCheckout": True,
-            "server_info": {
-                "upload_max_filesize": 2048,
-                "memory_limit": "128M",
-                "max_execution_time": "30",
-                "max_input_time": "-1",
-                "post_max_size": 8192
-            },
-            "useAi": False,
-            "defaultAi": "openai",
-            "maxShopDistance": None,
-            "siteLink": "https://pickbazar.redq.io",
-            "copyrightText": "Copyright \u00a9 REDQ. All rights reserved worldwide.",
-            "externalText": "REDQ",
-            "externalLink": "https://redq.io",
-            "smsEvent": {
-                "admin": {
-                    "statusChangeOrder": False,
-                    "refundOrder": False,
-                    "paymentOrder": False
-                },
-                "vendor": {
-                    "statusChangeOrder": False,
-                    "paymentOrder": False,
-                    "refundOrder": False
-                },
-                "customer": {
-                    "statusChangeOrder": False,
-                    "refundOrder": False,
-                    "paymentOrder": False
-                }
-            },
-            "emailEvent": {
-                "admin": {
-                    "statusChangeOrder": False,
-                    "refundOrder": False,
-                    "paymentOrder": False
-                },
-                "vendor": {
-                    "createQuestion": False,
-                    "statusChangeOrder": False,
-                    "refundOrder": False,
-                    "paymentOrder": False,
-                    "createReview": False
-                },
-                "customer": {
-                    "statusChangeOrder": False,
-                    "refundOrder": False,
-                    "paymentOrder": False,
-                    "answerQuestion": False
-                }
-            },
-            "pushNotification": {
-                "all": {
-                    "order": False,
-                    "message": False,
-                    "storeNotice": False
-                }
-            },
-            "isUnderMaintenance": False,
-            "maintenance": {
-                "title": "Site is under Maintenance",
-                "buttonTitleOne": "Notify Me",
-                "newsLetterTitle": "Subscribe Newsletter",
-                "buttonTitleTwo": "Contact Us",
-                "contactUsTitle": "Contact Us",
-                "aboutUsTitle": "About Us",
-                "isOverlayColor": False,
-                "overlayColor": None,
-                "overlayColorRange": None,
-                "description": "We are currently undergoing essential maintenance to elevate your browsing experience. Our team is working diligently to implement improvements that will bring you an even more seamless and enjoyable interaction with our site. During this period, you may experience temporary inconveniences. We appreciate your patience and understanding. Thank you for being a part of our community, and we look forward to unveiling the enhanced features and content soon.",
-                "newsLetterDescription": "Stay in the loop! Subscribe to our newsletter for exclusive deals and the latest trends delivered straight to your inbox. Elevate your shopping experience with insider access.",
-                "aboutUsDescription": "Welcome to Pickbazar, your go-to destination for curated excellence. Discover a fusion of style, quality, and affordability in every click. Join our community and elevate your shopping experience with us!",
-                "image": {
-                    "id": 1794,
-                    "file_name": "background.png",
-                    "original": "https://pickbazarlaravel.s3.ap-southeast-1.amazonaws.com/1792/background.png",
-                    "thumbnail": "https://pickbazarlaravel.s3.ap-southeast-1.amazonaws.com/1792/conversions/background-thumbnail.jpg"
-                },
-                "start": "2024-01-31T06:33:30.201258Z",
-                "until": "2024-02-01T06:33:30.201274Z"
-            },
-            "isPromoPopUp": True,
-            "promoPopup": {
-                "image": {
-                    "id": 1793,
-                    "original": "https://pickbazarlaravel.s3.ap-southeast-1.amazonaws.com/1791/pickbazar02.png",
-                    "file_name": "pickbazar02.png",
-                    "thumbnail": "https://pickbazarlaravel.s3.ap-southeast-1.amazonaws.com/1791/conversions/pickbazar02-thumbnail.jpg"
-                },
-                "title": "Get 25% Discount",
-                "popUpDelay": 5000,
-                "description": "Subscribe to the mailing list to receive updates on new arrivals, special offers and our promotions.",
-                "popUpNotShow": {
-                    "title": "Don't show this popup again",
-                    "popUpExpiredIn": 7
-                },
-                "isPopUpNotShow": True,
-                "popUpExpiredIn": 1
-            },
-            "app_settings": {
-                "last_checking_time": "2024-02-06T06:07:32.543238Z",
-                "trust": True
-            }
-        },
-        "language": "en",
-        "created_at": "2024-01-31T06:33:30.000000Z",
-        "updated_at": "2024-02-06T06:07:32.000000Z"
-    }
+    """Get the storefront settings."""
+    payload = await service.payload(language) or await service.payload()
+    return _settings_response(request, payload)
+
+
+@router.put("", dependencies=[Depends(PermissionsDependency([AdminPermission]))])
+async def update_application_settings(request: Request, setting_in: SettingUpdate):
+    """Replace the settings of a language, publishing a new version."""
+    payload = await service.update(setting_in)
+    return _settings_response(request, payload, conditional=False)
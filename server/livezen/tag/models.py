@@ -9,7 +9,7 @@ class Tag(models.Model):
     id = fields.BigIntField(pk=True, index=True)
     name = fields.CharField(max_length=20, unique=True)
     icon = fields.CharField(max_length=20)
-    slug = fields.CharField(max_length=20)
+    slug = fields.CharField(max_length=20, index=True)
     type: fields.ForeignKeyRelation[Type] = fields.ForeignKeyField(
         "models.Type", related_name="tags",
     )
@@ -4,5 +4,7 @@ from .models import Tag
 
 
 class TagRepository(BaseRepository[Tag]):
+    versioned = True
+
     def __init__(self):
         super().__init__(Tag)
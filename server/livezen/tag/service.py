@@ -1,8 +1,14 @@
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from slugify import slugify
 from tortoise.expressions import Q
 
-from .models import Tag, TagCreate, TagUpdate
+from livezen.catalog import catalog
+from livezen.enums import TotalMode
+from livezen.product.models import Product
+from livezen.product.related import related_index
+from livezen.product.search import search_index
+
+from .models import Tag, TagCreate, TagRead, TagUpdate
 from .repository import TagRepository
 
 
@@ -11,9 +17,9 @@ class TagService:
         self.repository = repository
 
     async def paginated(
-        self, page: int, page_size: int, search: Q = Q(), order: list = []
-    ) -> Tuple[int, List[Tag]]:
-        return await self.repository.paginated(page, page_size, search, order, prefetch=['type'])
+        self, page: int, page_size: int, search: Q = Q(), order: list = [], total: TotalMode = TotalMode.exact
+    ) -> Tuple[Optional[int], List[Tag]]:
+        return await self.repository.paginated(page, page_size, search, order, prefetch=['type'], total_mode=total)
 
     async def get(self, tag_id: int) -> Tag | None:
         """Gets a tag by id."""
@@ -23,21 +29,36 @@ class TagService:
         """Gets a tag by name."""
         return await self.repository.get(name=name)
 
-    async def get_by_slug(self, slug: str) -> Tag | None:
-        """Gets a tag by slug."""
+    async def get_by_slug(self, slug: str) -> Tag | TagRead | None:
+        """Gets a tag by slug, from the catalog snapshot when it is loaded."""
+        if catalog.loaded:
+            return catalog.snapshot.tags_by_slug.get(slug)
         return await self.repository.get(slug=slug, prefetch=['type'])
 
     async def create(self, tag_in: TagCreate) -> Tag:
         slug = slugify(tag_in.name)
-        return await self.repository.create(
+        tag = await self.repository.create(
             **tag_in.model_dump(exclude={"slug"}),
             slug=slug
         )
+        await catalog.reload()
+        return tag
 
     async def update(self, tag: Tag, tag_in: TagUpdate) -> Tag:
         """Updates a tag."""
-        return await self.repository.update(tag, **tag_in.model_dump(exclude_unset=True))
+        renamed = tag_in.name != tag.name
+        tag = await self.repository.update(tag, **tag_in.model_dump(exclude_unset=True))
+        if renamed:
+            await search_index.reindex_tag(tag.id)
+        await catalog.reload()
+        return tag
 
     async def delete(self, tag_id: int) -> bool:
         """Deletes a tag."""
-        return await self.repository.delete(tag_id)
+        product_ids = await Product.filter(tags__id=tag_id).values_list("id", flat=True)
+        deleted = await self.repository.delete(tag_id)
+        if deleted:
+            related_index.remove_tag(tag_id)
+            await search_index.index_products(product_ids)
+        await catalog.reload()
+        return deleted
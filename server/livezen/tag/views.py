@@ -1,62 +1,59 @@
 from typing import Optional
-from fastapi import APIRouter, Query
-from tortoise.expressions import Q
+from fastapi import APIRouter, Depends, Query
 
+from livezen.conditional import Conditional
+from livezen.enums import TotalMode
 from livezen.exceptions import ConflictException, ResourceNotFoundException
+from livezen.search import EXACT, SearchField, SearchSpec
+from livezen.type.models import Type
 
-from .models import TagCreate, TagPagination, TagRead, TagReadSimple, TagUpdate
+from .models import Tag, TagCreate, TagPagination, TagRead, TagReadSimple, TagUpdate
 from .repository import TagRepository
 from .service import TagService
 
 
 router = APIRouter()
 service = TagService(TagRepository())
+conditional = Conditional(Tag, Type)
 
+# Search keys clients may use, and how each is matched
+SEARCH_FIELDS = SearchSpec(Tag, {
+    "name": SearchField("name"),
+    "slug": SearchField("slug", lookup=EXACT),
+    "type.slug": SearchField("type__slug", lookup=EXACT),
+})
 
-@router.get("", response_model=TagPagination)
+
+@router.get("", response_model=TagPagination, dependencies=[Depends(conditional)])
 async def paginated_tags(
     page: int = Query(1, description="Page Number"),
     limit: int = Query(10, description="Items Per Page"),
     search: Optional[str] = Query("", description="Subject Name for Search"),
     searchJoin: str = Query(
         "and", description="'and' or 'or' join for multiple search conditions"),
+    total: TotalMode = Query(
+        TotalMode.exact, description="'exact', 'estimate' (the last counted total, may be stale) or 'none' (skip counting)"),
 ):
-    q = Q()
-    if search:
-        # Example: search="name:english;status:active"
-        filters = search.split(";")
-        for f in filters:
-            try:
-                field, value = f.split(":", 1)
-
-                # ✅ Support nested related lookups like 'type.slug'
-                field_path = field.replace(".", "__")
-
-                # Build lookup dynamically
-                lookup = {f"{field_path}__icontains": value}
-                condition = Q(**lookup)
-
-                if searchJoin.lower() == "or":
-                    q |= condition
-                else:
-                    q &= condition
-            except ValueError:
-                continue  # skip invalid filter format
-
-    total, data = await service.paginated(page=page, page_size=limit, search=q)
+    # Example: search="name:english;type.slug:grocery"
+    q = SEARCH_FIELDS.compile(search, searchJoin).q
+
+    total_count, data = await service.paginated(page=page, page_size=limit, search=q, total=total)
     return TagPagination(
         data=data,
         itemsPerPage=10,
         page=page,
         perPage=limit,
-        total=total,
+        total=total_count,
     )
 
 
-@router.get("/{slug}", response_model=TagRead)
+@router.get("/{slug}", response_model=TagRead, dependencies=[Depends(conditional)])
 async def get_tag(slug: str):
     """Get a tag by its slug."""
     tag = await service.get_by_slug(slug)
+    if not tag:
+        raise ResourceNotFoundException(
+            "A tag with this slug does not exist.")
     return tag
 
 
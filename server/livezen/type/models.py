@@ -9,7 +9,7 @@ class Type(models.Model):
     id = fields.BigIntField(pk=True, index=True)
     name = fields.CharField(max_length=20, unique=True)
     icon = fields.CharField(max_length=20)
-    slug = fields.CharField(max_length=20)
+    slug = fields.CharField(max_length=20, index=True)
     translated_languages = fields.JSONField(default=list)
     settings = fields.JSONField(null=True)
     banners = fields.JSONField(default=list, null=True)
@@ -4,5 +4,7 @@ from .models import Type
 
 
 class TypeRepository(BaseRepository[Type]):
+    versioned = True
+
     def __init__(self):
         super().__init__(Type)
@@ -2,7 +2,9 @@ from typing import List, Tuple
 from slugify import slugify
 from tortoise.expressions import Q
 
-from .models import Type, TypeCreate, TypeUpdate
+from livezen.catalog import catalog
+
+from .models import Type, TypeCreate, TypeRead, TypeUpdate
 from .repository import TypeRepository
 
 
@@ -15,7 +17,9 @@ class TypeService:
     ) -> Tuple[int, List[Type]]:
         return await self.repository.paginated(page, page_size, search, order)
 
-    async def list(self) -> List[Type]:
+    async def list(self) -> List[Type] | List[TypeRead]:
+        if catalog.loaded:
+            return catalog.snapshot.types
         return await self.repository.list()
 
     async def get(self, type_id: int) -> Type | None:
@@ -26,22 +30,30 @@ class TypeService:
         """Gets a type by name."""
         return await self.repository.get(name=name)
 
-    async def get_by_slug(self, slug: str) -> Type | None:
-        """Gets a type by slug."""
+    async def get_by_slug(self, slug: str) -> Type | TypeRead | None:
+        """Gets a type by slug, from the catalog snapshot when it is loaded."""
+        if catalog.loaded:
+            return catalog.snapshot.types_by_slug.get(slug)
         return await self.repository.get(slug=slug)
 
     async def create(self, type_in: TypeCreate) -> Type:
         slug = slugify(type_in.name)
-        return await self.repository.create(
+        type = await self.repository.create(
             **type_in.model_dump(exclude={"slug", "translated_languages"}),
             slug=slug,
             translated_languages=["en"]
         )
+        await catalog.reload()
+        return type
 
     async def update(self, type: Type, type_in: TypeUpdate) -> Type:
         """Updates a type."""
-        return await self.repository.update(type, **type_in.model_dump(exclude_unset=True))
+        type = await self.repository.update(type, **type_in.model_dump(exclude_unset=True))
+        await catalog.reload()
+        return type
 
     async def delete(self, type_id: int) -> bool:
         """Deletes a type."""
-        return await self.repository.delete(type_id)
+        deleted = await self.repository.delete(type_id)
+        await catalog.reload()
+        return deleted
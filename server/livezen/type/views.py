@@ -1,16 +1,18 @@
 from typing import List, Optional
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query
 from tortoise.expressions import Q
 
+from livezen.conditional import Conditional
 from livezen.exceptions import ConflictException, ResourceNotFoundException
 
-from .models import TypeCreate, TypePagination, TypeRead, TypeUpdate
+from .models import Type, TypeCreate, TypePagination, TypeRead, TypeUpdate
 from .repository import TypeRepository
 from .service import TypeService
 
 
 router = APIRouter()
 service = TypeService(TypeRepository())
+conditional = Conditional(Type)
 
 # Mapping of special search keys → list of model fields to search
 SEARCH_FIELD_MAPPINGS = {
@@ -60,17 +62,20 @@ SEARCH_FIELD_MAPPINGS = {
 #         total=total,
 #     )
 
-@router.get("", response_model=List[TypeRead])
+@router.get("", response_model=List[TypeRead], dependencies=[Depends(conditional)])
 async def list():
     """Get type list."""
     type_list = await service.list()
     return type_list
 
 
-@router.get("/{slug}", response_model=TypeRead)
+@router.get("/{slug}", response_model=TypeRead, dependencies=[Depends(conditional)])
 async def get_type(slug: str):
     """Get a type by its slug."""
     type = await service.get_by_slug(slug)
+    if not type:
+        raise ResourceNotFoundException(
+            "A type with this slug does not exist.")
     return type
 
 
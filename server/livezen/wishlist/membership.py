@@ -0,0 +1,126 @@
+"""
+In-process cache of each user's wishlisted product ids.
+
+A user's ids are loaded with one query the first time they are needed and kept
+as a sorted `array('q')` (8 bytes per id, binary-searched), so annotating a
+page of product cards with "in my wishlist" costs no query. WishlistService
+updates the cached array on toggle/remove.
+
+Entries expire after WISHLIST_CACHE_TTL seconds (to pick up changes made by
+other worker processes) and the least recently used users are evicted once the
+arrays take more than WISHLIST_CACHE_MAX_BYTES.
+"""
+import sys
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Iterable, Optional, Set
+
+from livezen.config import WISHLIST_CACHE_MAX_BYTES, WISHLIST_CACHE_TTL
+
+from .repository import WishlistRepository
+
+# Dict slot, key and _Entry object, on top of the array itself
+ENTRY_OVERHEAD = 200
+
+
+class _Entry:
+    __slots__ = ("ids", "loaded_at", "size", "fingerprint")
+
+    def __init__(self, ids: array, loaded_at: float):
+        self.ids = ids
+        self.loaded_at = loaded_at
+        self.size = sys.getsizeof(ids) + ENTRY_OVERHEAD
+        self.fingerprint: Optional[str] = None
+
+    def contains(self, product_id: int) -> bool:
+        index = bisect_left(self.ids, product_id)
+        return index < len(self.ids) and self.ids[index] == product_id
+
+
+class WishlistMembership:
+    def __init__(
+        self,
+        repository: WishlistRepository,
+        ttl: float = WISHLIST_CACHE_TTL,
+        max_bytes: int = WISHLIST_CACHE_MAX_BYTES,
+    ):
+        self.repository = repository
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size = 0  # bytes held by all entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._writes = 0  # bumped by add/remove, to spot loads that raced a write
+
+    async def contains(self, user_id: Any, product_id: int) -> bool:
+        return (await self._entry(user_id)).contains(product_id)
+
+    async def contains_many(self, user_id: Any, product_ids: Iterable[int]) -> Set[int]:
+        """The subset of `product_ids` in the user's wishlist."""
+        entry = await self._entry(user_id)
+        return {product_id for product_id in product_ids if entry.contains(product_id)}
+
+    async def fingerprint(self, user_id: Any) -> str:
+        """Short digest of the user's wishlist, for ETags of personalized pages."""
+        entry = await self._entry(user_id)
+        if entry.fingerprint is None:
+            entry.fingerprint = format(zlib.crc32(entry.ids.tobytes()), "08x")
+        return entry.fingerprint
+
+    def add(self, user_id: Any, product_id: int) -> None:
+        self._writes += 1
+        entry = self._entries.get(str(user_id))
+        if entry is not None and not entry.contains(product_id):
+            ids = array("q", entry.ids)
+            ids.insert(bisect_left(ids, product_id), product_id)
+            self._replace(str(user_id), ids, entry.loaded_at)
+
+    def remove(self, user_id: Any, product_id: int) -> None:
+        self._writes += 1
+        entry = self._entries.get(str(user_id))
+        if entry is not None and entry.contains(product_id):
+            ids = array("q", entry.ids)
+            del ids[bisect_left(ids, product_id)]
+            self._replace(str(user_id), ids, entry.loaded_at)
+
+    def forget(self, user_id: Any) -> None:
+        self._writes += 1
+        entry = self._entries.pop(str(user_id), None)
+        if entry is not None:
+            self.size -= entry.size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+    async def _entry(self, user_id: Any) -> _Entry:
+        key = str(user_id)
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry.loaded_at <= self.ttl:
+            self._entries.move_to_end(key)
+            return entry
+
+        writes = self._writes
+        loaded_at = time.monotonic()
+        ids = array("q", sorted(await self.repository.product_ids(user_id)))
+        if writes != self._writes:
+            # A toggle landed while loading: use the result once, but do not keep it
+            return _Entry(ids, loaded_at)
+        return self._replace(key, ids, loaded_at)
+
+    def _replace(self, key: str, ids: array, loaded_at: float) -> _Entry:
+        # Entries are replaced, never mutated, so an entry held across an await stays consistent
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= old.size
+        entry = self._entries[key] = _Entry(ids, loaded_at)
+        self.size += entry.size
+        while self.size > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+        return entry
+
+
+wishlist_membership = WishlistMembership(WishlistRepository())
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from tortoise import fields, models
 
 from livezen.models import Pagination
@@ -44,5 +44,9 @@ class ToggleWishlist(BaseModel):
     product_id: int
 
 
+class WishlistContains(BaseModel):
+    product_ids: list[int] = Field(max_length=500)
+
+
 class WishlistPagination(Pagination):
     data: list[WishlistRead]
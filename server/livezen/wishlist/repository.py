@@ -1,3 +1,5 @@
+from typing import Iterable, List, Optional
+
 from livezen.repository import BaseRepository
 
 from .models import Wishlist
@@ -6,3 +8,21 @@ from .models import Wishlist
 class WishlistRepository(BaseRepository[Wishlist]):
     def __init__(self):
         super().__init__(Wishlist)
+
+    async def product_ids(self, user_id, product_ids: Optional[Iterable[int]] = None) -> List[int]:
+        """Ids of the products in a user's wishlist, optionally only among `product_ids`."""
+        query = self._read(user_id=user_id)
+        if product_ids is not None:
+            query = query.filter(product_id__in=list(product_ids))
+        return await query.values_list("product_id", flat=True)
+
+    async def add(self, user_id, product_id: int) -> None:
+        await self.model.create(user_id=user_id, product_id=product_id)
+        self.invalidate_counts()
+
+    async def remove_product(self, user_id, product_id: int) -> bool:
+        """Delete one (user, product) row; False if there was none."""
+        deleted = await self.model.filter(user_id=user_id, product_id=product_id).delete()
+        if deleted:
+            self.invalidate_counts()
+        return bool(deleted)
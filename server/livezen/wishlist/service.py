@@ -1,9 +1,10 @@
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 from fastapi import HTTPException
-from tortoise.exceptions import DoesNotExist
+from tortoise.exceptions import IntegrityError
 from tortoise.expressions import Q
 
 from livezen.product.models import Product
+from livezen.wishlist.membership import wishlist_membership
 from livezen.wishlist.models import ToggleWishlist, Wishlist
 from livezen.wishlist.repository import WishlistRepository
 
@@ -15,23 +16,28 @@ class WishlistService:
     async def toggle_wishlist(self, current_user, data_in: ToggleWishlist) -> bool:
         """Add or remove a product from user's wishlist."""
 
-        # Ensure product exists
-        try:
-            product = await Product.get(id=data_in.product_id)
-        except DoesNotExist:
-            raise HTTPException(status_code=404, detail="Product not found")
-
-        # Check if wishlist entry exists
-        existing = await Wishlist.filter(user_id=current_user.id, product_id=product.id).first()
-
-        if existing:
-            # Product is already in wishlist → remove it
-            await existing.delete()
+        # Product is already in wishlist → remove it (one DELETE)
+        if await self.repository.remove_product(current_user.id, data_in.product_id):
+            wishlist_membership.remove(current_user.id, data_in.product_id)
             return False
-        else:
-            # Add to wishlist
-            await Wishlist.create(user_id=current_user.id, product_id=product.id)
-            return True
+
+        # Add to wishlist; the (user, product) unique index settles concurrent toggles
+        try:
+            await self.repository.add(current_user.id, data_in.product_id)
+        except IntegrityError:
+            # Either the product does not exist (foreign key) or a concurrent request added it
+            if not await Product.exists(id=data_in.product_id):
+                raise HTTPException(status_code=404, detail="Product not found")
+        wishlist_membership.add(current_user.id, data_in.product_id)
+        return True
+
+    async def in_wishlist(self, current_user, product_id: int) -> bool:
+        return await wishlist_membership.contains(current_user.id, product_id)
+
+    async def contains(self, current_user, product_ids: List[int]) -> Dict[int, bool]:
+        """Wishlist membership of each of `product_ids`, from the membership cache."""
+        found = await wishlist_membership.contains_many(current_user.id, product_ids)
+        return {product_id: product_id in found for product_id in product_ids}
 
     # async def my_wishlist(self, current_user: CurrentUser):
     #     return await self.repository.filter(user_id=current_user.id, prefetch=['product'])
@@ -41,6 +47,15 @@ class WishlistService:
     ) -> Tuple[int, List[Wishlist]]:
         return await self.repository.paginated(page, page_size, search, order, prefetch=['product'])
 
+    async def my_wishlist_cursor_paginated(
+        self, page_size: int, after: Optional[str] = None, search: Q = Q(), order: list = []
+    ) -> Tuple[List[Wishlist], Optional[str]]:
+        return await self.repository.keyset_paginated(page_size, after, search, order, prefetch=['product'])
+
     async def remove(self, wishlist_id: int) -> bool:
         """Deletes a wishlist."""
-        return await self.repository.delete(wishlist_id)
+        entry = await Wishlist.filter(id=wishlist_id).first().values("user_id", "product_id")
+        deleted = await self.repository.delete(wishlist_id)
+        if deleted and entry:
+            wishlist_membership.remove(entry["user_id"], entry["product_id"])
+        return deleted
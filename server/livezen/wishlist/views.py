@@ -5,7 +5,7 @@ from tortoise.expressions import Q
 from livezen.auth.utils import CurrentUser
 from livezen.product.models import Product, ProductRead
 from livezen.wishlist.repository import WishlistRepository
-from livezen.wishlist.models import ToggleWishlist, Wishlist, WishlistPagination, WishlistRead
+from livezen.wishlist.models import ToggleWishlist, Wishlist, WishlistContains, WishlistPagination, WishlistRead
 from livezen.wishlist.service import WishlistService
 
 router = APIRouter()
@@ -18,17 +18,21 @@ async def in_wishlist(product_id: int, current_user: CurrentUser):
     Check if a product is in the user's wishlist.
     Returns True if in wishlist, False otherwise.
     """
-    # ✅ Check if product exists
-    product_exists = await Product.exists(id=product_id)
-    if not product_exists:
+    # ✅ A wishlisted product exists, so the product is only looked up on a miss
+    if await service.in_wishlist(current_user, product_id):
+        return True
+    if not await Product.exists(id=product_id):
         raise HTTPException(status_code=404, detail="Product not found")
+    return False
 
-    # ✅ Check if the product is in the wishlist
-    is_in_wishlist = await Wishlist.exists(
-        user_id=current_user.id, product_id=product_id
-    )
 
-    return is_in_wishlist
+@router.post("/contains", response_model=dict[int, bool])
+async def wishlist_contains(data_in: WishlistContains, current_user: CurrentUser):
+    """
+    Check many products at once, e.g. every card on a listing page.
+    Returns {product_id: in wishlist}; unknown products are simply False.
+    """
+    return await service.contains(current_user, data_in.product_ids)
 
 
 @router.post("/toggle", response_model=bool)
@@ -48,8 +52,21 @@ async def my_wishlist(
     search: Optional[str] = Query("", description="Subject Name for Search"),
     searchJoin: str = Query(
         "and", description="'and' or 'or' join for multiple search conditions"),
+    after: Optional[str] = Query(
+        None, description="Cursor from the previous page's next_cursor; pass an empty value to start cursor pagination"),
 ):
-    q = Q()
+    q = Q(user_id=current_user.id)
+    if after is not None:
+        # Keyset mode: no COUNT and no OFFSET, page cost stays flat
+        data, next_cursor = await service.my_wishlist_cursor_paginated(page_size=limit, after=after, search=q)
+        return WishlistPagination(
+            data=data,
+            itemsPerPage=10,
+            page=page,
+            perPage=limit,
+            next_cursor=next_cursor,
+        )
+
     total, data = await service.my_wishlist_paginated(page=page, page_size=limit, search=q)
     return WishlistPagination(
         data=data,
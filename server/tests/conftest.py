@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# livezen.config reads the environment on import: point it at a throwaway database first
+os.environ["DB_ENGINE"] = "sqlite"
+os.environ["DB_FILE"] = os.path.join(tempfile.mkdtemp(prefix="livezen-tests-"), "db.sqlite3")
@@ -0,0 +1,30 @@
+import asyncio
+
+import httpx
+from tortoise import Tortoise, connections
+
+from livezen.config import TORTOISE_ORM, WRITE_CONNECTION
+from livezen.main import app
+
+
+async def _database_without_setting_table() -> None:
+    """The schema as it was before the setting table was added."""
+    await Tortoise.init(config=TORTOISE_ORM)
+    try:
+        await Tortoise.generate_schemas(safe=True)
+        await connections.get(WRITE_CONNECTION).execute_script('DROP TABLE "setting"')
+    finally:
+        await Tortoise.close_connections()
+
+
+def test_settings_on_a_database_without_the_table():
+    async def run():
+        await _database_without_setting_table()
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                response = await client.get("/api/settings")
+                assert response.status_code == 200
+                assert response.headers["etag"]
+                assert "options" in response.json()
+
+    asyncio.run(run())